@@ -0,0 +1,25 @@
+# agent/_coerce.py
+from __future__ import annotations
+from typing import Any, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+def to_float(x: Any) -> Optional[float]:
+    """float(x), or None when x can't be coerced (None, 'n/a', dicts, ...)."""
+    try:
+        return float(x)
+    except Exception:
+        return None
+
+def to_float_column(values: Iterable[Any]) -> np.ndarray:
+    """to_float over a whole column in one C-level pass; NaN where it would give None."""
+    col = pd.Series(list(values), dtype=object)
+    try:
+        return pd.to_numeric(col, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    except (OverflowError, TypeError):  # e.g. ints beyond float range
+        return np.array([np.nan if (v := to_float(x)) is None else v for x in col], dtype=np.float64)
+
+def to_bool01_column(values: Iterable[Any]) -> np.ndarray:
+    """1.0/0.0 by truthiness (so any non-empty string is 1.0); NaN only for None."""
+    return np.fromiter((np.nan if x is None else float(bool(x)) for x in values), dtype=np.float64)
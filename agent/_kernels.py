@@ -0,0 +1,82 @@
+# agent/_kernels.py
+from __future__ import annotations
+
+import numpy as np
+
+# numba is optional: without it these run as plain Python/NumPy loops over columns.
+# fastmath is deliberately not enabled -- it assumes no NaNs, and NaN marks missing values here.
+try:
+    from numba import njit, prange
+except Exception:  # pragma: no cover
+    def njit(*args, **kwargs):
+        return lambda f: f
+    prange = range
+
+
+@njit(cache=True)
+def _interp(part, idx):
+    lo = int(np.floor(idx))
+    w = idx - lo
+    return part[lo] * (1.0 - w) + part[int(np.ceil(idx))] * w
+
+
+@njit(cache=True)
+def _order_quantile(vals, p):
+    """Linear-interpolated quantile of a NaN-free 1-D array (partition, no full sort)."""
+    idx = (vals.size - 1) * p
+    part = np.partition(vals, np.array([int(np.floor(idx)), int(np.ceil(idx))]))
+    return _interp(part, idx)
+
+
+@njit(cache=True)
+def _quartiles(vals):
+    """(Q1, Q3) of a NaN-free 1-D array from a single partition on all four order statistics."""
+    i1 = (vals.size - 1) * 0.25
+    i3 = (vals.size - 1) * 0.75
+    kth = np.array([int(np.floor(i1)), int(np.ceil(i1)), int(np.floor(i3)), int(np.ceil(i3))])
+    part = np.partition(vals, kth)
+    return _interp(part, i1), _interp(part, i3)
+
+
+@njit(cache=True, parallel=True)
+def impute_median(X):
+    """
+    Median-impute NaNs in place, column by column.
+    Returns a keep mask: False for all-missing and zero-variance columns.
+    """
+    n, m = X.shape
+    keep = np.zeros(m, dtype=np.bool_)
+    for j in prange(m):
+        col = X[:, j]
+        vals = col[~np.isnan(col)]
+        if vals.size == 0:
+            continue
+        med = _order_quantile(vals, 0.5)
+        vmin = vals.min()
+        vmax = vals.max()
+        keep[j] = abs(vmax - vmin) > 1e-9 * max(abs(vmin), abs(vmax))
+        col[np.isnan(col)] = med
+    return keep
+
+
+@njit(cache=True, parallel=True)
+def iqr_flags(M, k):
+    """Per-row flag: True if any non-NaN value lies outside [q1 - k*iqr, q3 + k*iqr] for its column."""
+    n, m = M.shape
+    lo = np.full(m, -np.inf)
+    hi = np.full(m, np.inf)
+    for j in prange(m):
+        col = M[:, j]
+        vals = col[~np.isnan(col)]
+        if vals.size < 4:
+            continue
+        q1, q3 = _quartiles(vals)
+        iqr = max(q3 - q1, 1e-9)
+        lo[j] = q1 - k * iqr
+        hi[j] = q3 + k * iqr
+    out = np.zeros(n, dtype=np.bool_)
+    for j in range(m):
+        col = M[:, j]
+        # NaN compares False on both sides, so missing values never flag
+        out |= (col < lo[j]) | (col > hi[j])
+    return out
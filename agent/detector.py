@@ -1,14 +1,29 @@
 # agent/detector.py
 from __future__ import annotations
-from typing import List, Dict, Any, Tuple
-import math
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import cached_property
+from pathlib import Path
+from typing import List, Dict, Any, Tuple, Union
+
+import numpy as np
+
+from agent._coerce import to_bool01_column, to_float_column
+from agent._kernels import impute_median, iqr_flags
 
-# scikit-learn only (no numpy required here)
 try:
+    import joblib
     from sklearn.ensemble import IsolationForest
 except Exception:  # pragma: no cover
+    joblib = None
     IsolationForest = None  # handled below
 
+# Fitted forests are memoized on disk, keyed by (matrix, feature schema, params);
+# least recently used models are evicted past _CACHE_BYTES_LIMIT
+_CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "iforest"
+_CACHE_BYTES_LIMIT = 256 * 1024 * 1024
+
 
 # ----------------------------
 # Helpers
@@ -19,20 +34,9 @@ _EXCLUDE_FOR_IQR = {
     "license_status", "version", "version_major", "version_minor", "version_patch",
 }
 
-def _num(x):
-    try:
-        return float(x)
-    except Exception:
-        return None
-
-def _bool01(x):
-    if x is None:
-        return None
-    return 1.0 if bool(x) else 0.0
-
-def _build_feature_matrix(rows: List[Dict[str, Any]]) -> Tuple[List[List[float]], List[str]]:
+def _build_feature_matrix(rows: List[Dict[str, Any]]) -> Tuple[np.ndarray, List[str]]:
     """
-    Build a robust numeric feature matrix from device facts + healthchecks.
+    Build a robust float32 feature matrix from device facts + healthchecks.
     Missing values are median-imputed; zero-variance columns are dropped.
     """
     candidates = [
@@ -59,117 +63,185 @@ def _build_feature_matrix(rows: List[Dict[str, Any]]) -> Tuple[List[List[float]]
         "hc_uptime_min_threshold",
     ]
 
-    # Raw (with None)
-    raw: List[List[float | None]] = []
-    for r in rows:
-        vec: List[float | None] = []
-        for k in candidates:
-            if k == "license_expired":
-                v = _bool01(r.get(k))
-            else:
-                v = _num(r.get(k))
-            vec.append(v)
-        raw.append(vec)
-
-    if not raw:
-        return [], []
+    if not rows:
+        return np.empty((0, 0)), []
 
     n = len(rows)
     m = len(candidates)
 
-    # Column-wise median impute & zero-variance drop
-    cols = [[raw[i][j] for i in range(n)] for j in range(m)]
-
-    medians: List[float | None] = []
-    keep_mask: List[bool] = []
-    for j, col in enumerate(cols):
-        vals = [v for v in col if isinstance(v, (int, float))]
-        if not vals:
-            medians.append(None)
-            keep_mask.append(False)
-            continue
-        vals.sort()
-        L = len(vals)
-        mid = L // 2
-        if L % 2 == 1:
-            med = float(vals[mid])
+    # Columnar matrix, NaN marks missing values. float32 is what sklearn's trees
+    # split on anyway, so this skips IsolationForest's internal float64 -> float32 copy.
+    X = np.full((n, m), np.nan, dtype=np.float32)
+    for j, k in enumerate(candidates):
+        if k == "license_expired":
+            X[:, j] = to_bool01_column(r.get(k) for r in rows)
         else:
-            med = 0.5 * (vals[mid - 1] + vals[mid])
-        medians.append(med)
-        keep_mask.append(not math.isclose(vals[0], vals[-1]))
-
-    kept_names: List[str] = []
-    X: List[List[float]] = []
-    for i in range(n):
-        row_vec: List[float] = []
-        for j in range(m):
-            if not keep_mask[j]:
-                continue
-            v = raw[i][j]
-            if v is None:
-                v = medians[j]
-            # if still None (shouldn't happen), use 0
-            row_vec.append(float(v if v is not None else 0.0))
-        X.append(row_vec)
-
-    for j in range(m):
-        if keep_mask[j]:
-            kept_names.append(candidates[j])
+            X[:, j] = to_float_column(r.get(k) for r in rows)
+
+    # Column-wise median impute & zero-variance drop
+    keep = impute_median(X)
+    X = np.ascontiguousarray(X[:, keep])
 
+    kept_names = [candidates[j] for j in np.flatnonzero(keep)]
     return X, kept_names
 
 
+# ----------------------------
+# Shared feature extraction
+# ----------------------------
+
+class FeatureFrame:
+    """
+    Columnar views of one row set, each built at most once and shared by the
+    detectors (build it once per request, pass it to either/both detectors).
+      - iforest: (median-imputed X, kept feature names)
+      - iqr:     (NaN-padded M, candidate numeric columns)
+    """
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self.rows = rows
+
+    @cached_property
+    def iforest(self) -> Tuple[np.ndarray, List[str]]:
+        return _build_feature_matrix(self.rows)
+
+    @cached_property
+    def iqr(self) -> Tuple[np.ndarray, List[str]]:
+        cols = _candidate_numeric_cols(self.rows)
+        return _numeric_matrix(self.rows, cols), cols
+
+Rows = Union[List[Dict[str, Any]], FeatureFrame]
+
+def _as_frame(rows: Rows) -> FeatureFrame:
+    return rows if isinstance(rows, FeatureFrame) else FeatureFrame(rows)
+
+
 # ----------------------------
 # IsolationForest detector
 # ----------------------------
 
-def detect_outliers_iforest(
-    rows: List[Dict[str, Any]],
+def _fit_iforest(
+    X: np.ndarray,
+    feats: Tuple[str, ...],
+    contamination: float,
+    random_state: int,
+    high_precision: bool = False,
+    n_jobs: int = -1,
+):
+    """
+    Fit a forest; `feats` is unused here but is part of the cache key
+    (`n_jobs` is not: it changes wall-clock, not the fitted trees).
+    Each tree sees max_samples=min(256, n) rows; per Liu et al. (the IF paper)
+    path lengths converge by ~100 such trees, so 300 only buys score stability.
+    """
+    clf = IsolationForest(
+        n_estimators=300 if high_precision else 100,
+        max_samples="auto",
+        contamination=contamination,
+        max_features=1.0,
+        bootstrap=False,
+        n_jobs=n_jobs,
+        random_state=random_state,
+    )
+    return clf.fit(X)
+
+if joblib is not None:
+    _memory = joblib.Memory(str(_CACHE_DIR), verbose=0)
+    _fit_iforest_cached = _memory.cache(_fit_iforest, ignore=["n_jobs"])
+
+    def _fit_iforest(*args, **kwargs):  # noqa: F811 -- bounded wrapper around the memoized fit
+        fresh = not _fit_iforest_cached.check_call_in_cache(*args, **kwargs)
+        clf = _fit_iforest_cached(*args, **kwargs)
+        if fresh:  # only a new fit can grow the cache
+            _memory.reduce_size(bytes_limit=_CACHE_BYTES_LIMIT)
+        return clf
+
+# (matrix digest, feats, params) -> (mask, scores). Page loads re-run the same
+# detector over unchanged uploads; this skips the fit lookup and scoring pass.
+_SCORE_CACHE_MAX = 8
+_score_cache: "OrderedDict[tuple, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+_score_lock = threading.Lock()
+
+def _score_key(X: np.ndarray, feats: List[str], *params) -> tuple:
+    digest = hashlib.blake2b(X.tobytes(), digest_size=16).digest()
+    return (digest, X.shape, tuple(feats), *params)
+
+def iforest_mask(
+    rows: Rows,
     contamination: float = 0.10,
     random_state: int = 42,
-) -> Tuple[List[Dict[str, Any]], List[str], List[float]]:
+    high_precision: bool = False,
+    n_jobs: int = -1,
+) -> Tuple[np.ndarray, List[str], np.ndarray]:
     """
     IsolationForest with robust preprocessing:
       - median-impute missing values
       - drop zero-variance columns
-      - if predict() returns none, return top-k most anomalous by score_samples
-    Returns (anomalies, feature_names, scores_for_those_anomalies).
+      - if predict() returns none, flag the top-k most anomalous by score_samples
+    high_precision=True fits 300 trees instead of 100; trees are built on
+    `n_jobs` threads (-1 = all cores).
+    Returns (bool mask over rows, feature_names, score_samples for every row).
+    Masks from different detectors combine with | / & -- no per-row set work.
     """
-    if IsolationForest is None or not rows:
-        return [], [], []
+    frame = _as_frame(rows)
+    n = len(frame.rows)
+    if IsolationForest is None or not n:
+        return np.zeros(n, dtype=bool), [], np.empty(0)
 
-    X, feats = _build_feature_matrix(rows)
-    if not feats or not X or not X[0]:
-        return [], feats, []
+    X, feats = frame.iforest
+    if not feats or X.size == 0:
+        return np.zeros(n, dtype=bool), feats, np.empty(0)
 
-    n = len(rows)
     # keep contamination sane
     contamination = float(max(0.01, min(0.5, contamination)))
     top_k = max(1, int(round(n * contamination)))
 
-    clf = IsolationForest(
-        n_estimators=300,
-        contamination=contamination,
-        max_features=1.0,
-        bootstrap=False,
-        random_state=random_state,
-    )
-    clf.fit(X)
+    key = _score_key(X, feats, contamination, random_state, high_precision)
+    with _score_lock:
+        hit = _score_cache.get(key)
+        if hit is not None:
+            _score_cache.move_to_end(key)
+    if hit is not None:
+        return hit[0].copy(), feats, hit[1].copy()
 
-    pred = clf.predict(X)             # -1 anomaly, 1 normal
-    scores = clf.score_samples(X)     # higher = less anomalous
+    clf = _fit_iforest(X, tuple(feats), contamination, random_state, high_precision, n_jobs)
 
-    idxs = [i for i, p in enumerate(pred) if p == -1]
-    if not idxs:
+    mask = clf.predict(X) == -1       # -1 anomaly, 1 normal
+    scores = clf.score_samples(X)     # higher = less anomalous
+    if not mask.any():
         # force top-k lowest scores (most anomalous)
-        ranked = sorted(range(n), key=lambda i: scores[i])
-        idxs = ranked[:top_k]
+        mask[np.argsort(scores, kind="stable")[:top_k]] = True
+
+    with _score_lock:
+        _score_cache[key] = (mask.copy(), scores.copy())
+        while len(_score_cache) > _SCORE_CACHE_MAX:
+            _score_cache.popitem(last=False)
+    return mask, feats, scores
 
-    anomalies = [rows[i] for i in idxs]
-    for i in idxs:
-        rows[i]["_iforest_score"] = float(scores[i])  # optional: for UI
+def rows_where(rows: Rows, mask: np.ndarray) -> List[Dict[str, Any]]:
+    """Materialize the rows selected by a detector mask (in row order)."""
+    rows = _as_frame(rows).rows
+    return [rows[i] for i in np.flatnonzero(mask)]
 
-    return anomalies, feats, [float(scores[i]) for i in idxs]
+def detect_outliers_iforest(
+    rows: Rows,
+    contamination: float = 0.10,
+    random_state: int = 42,
+    high_precision: bool = False,
+    n_jobs: int = -1,
+) -> Tuple[List[Dict[str, Any]], List[str], np.ndarray]:
+    """
+    Row-list form of iforest_mask.
+    `rows` may be a FeatureFrame to reuse an already-built matrix.
+    Returns (anomalies, feature_names, float64 array of those anomalies' scores).
+    """
+    frame = _as_frame(rows)
+    mask, feats, scores = iforest_mask(frame, contamination, random_state, high_precision, n_jobs)
+    idxs = np.flatnonzero(mask)
+    picked = scores[idxs]
+    for i, v in zip(idxs, picked.tolist()):
+        frame.rows[i]["_iforest_score"] = v  # optional: for UI
+    return rows_where(frame, mask), feats, picked
 
 
 # ----------------------------
@@ -195,44 +267,35 @@ def feature_names(rows: List[Dict[str, Any]]) -> List[str]:
     """Helper used by UI if needed."""
     return _candidate_numeric_cols(rows)
 
-def _iqr_flags(values: List[Any], k: float = 1.5) -> List[bool]:
-    nums = [v for v in values if isinstance(v, (int, float))]
-    n = len(nums)
-    if n < 4:
-        return [False] * len(values)
-    nums = sorted(nums)
-
-    def pct(p: float) -> float:
-        idx = (n - 1) * p
-        lo, hi = int(math.floor(idx)), int(math.ceil(idx))
-        w = idx - lo
-        return nums[lo] * (1 - w) + nums[hi] * w
-
-    q1, q3 = pct(0.25), pct(0.75)
-    iqr = max(q3 - q1, 1e-9)
-    lo, hi = q1 - k * iqr, q3 + k * iqr
-    out = []
-    for v in values:
-        out.append(False if not isinstance(v, (int, float)) else not (lo <= v <= hi))
-    return out
+def _numeric_matrix(rows: List[Dict[str, Any]], cols: List[str]) -> np.ndarray:
+    """Columnar float64 matrix of `cols`; non-numeric/missing values are NaN."""
+    M = np.full((len(rows), len(cols)), np.nan, dtype=np.float64)
+    for i, r in enumerate(rows):
+        for j, c in enumerate(cols):
+            v = r.get(c)
+            if isinstance(v, (int, float)):
+                M[i, j] = v
+    return M
+
+def iqr_mask(rows: Rows, k: float = 1.5) -> Tuple[np.ndarray, List[str]]:
+    """
+    Simple IQR across all numeric columns with some variance.
+    Returns (bool mask over rows, feature_names).
+    """
+    frame = _as_frame(rows)
+    M, cols = frame.iqr
+    if not frame.rows or not cols:
+        return np.zeros(len(frame.rows), dtype=bool), cols
+    return iqr_flags(M, k), cols
 
 def detect_outliers_iqr(
-    rows: List[Dict[str, Any]],
+    rows: Rows,
     k: float = 1.5
 ) -> Tuple[List[Dict[str, Any]], List[str], List[float]]:
     """
-    Simple IQR across all numeric columns with some variance.
+    Row-list form of iqr_mask.
+    `rows` may be a FeatureFrame to reuse an already-built matrix.
     Returns (anomalies, feature_names, scores=[]).
     """
-    cols = _candidate_numeric_cols(rows)
-    if not rows or not cols:
-        return [], cols, []
-
-    flags_any = [False] * len(rows)
-    for c in cols:
-        vals = [r.get(c) for r in rows]
-        flags = _iqr_flags(vals, k=k)
-        flags_any = [a or b for a, b in zip(flags_any, flags)]
-
-    anomalies = [r for r, fl in zip(rows, flags_any) if fl]
-    return anomalies, cols, []
+    mask, cols = iqr_mask(rows, k)
+    return rows_where(rows, mask), cols, []
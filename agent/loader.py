@@ -1,20 +1,64 @@
 # agent/loader.py
 from __future__ import annotations
 import json
-import re
+import mmap
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from typing import Dict, List, Tuple, Any
 
-def _mb(v):
-    try:
-        return float(v)
-    except Exception:
-        return None
+from agent._coerce import to_float
+
+# Optional: parsed rows are cached as Parquet so unchanged reports are not re-parsed
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except Exception:  # pragma: no cover
+    pa = pq = None
+
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None
+
+_PARSE_CACHE = ".parse_cache.parquet"
+_PARSER_VERSION = 1  # bump when parse_report's rows change; cached rows from other versions are re-parsed
+_PARALLEL_MIN_FILES = 8  # below this, shipping work to the pool costs more than it saves
+_STAT_KEYS = ("_mtime_ns", "_size")
+_CACHE_KEYS = (*_STAT_KEYS, "_parser_version")
+_MMAP_MIN_BYTES = 16 << 20  # smaller files: one read() is cheaper than setting up a mapping
+
+def _loads(data: bytes) -> Any:
+    """orjson when available; stdlib json for anything it rejects (e.g. NaN literals)."""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+def _load_json_file(path: Path) -> Any:
+    """Parse a JSON file; large ones are parsed by orjson straight from mapped pages."""
+    with open(path, "rb") as f:
+        if orjson is None or os.fstat(f.fileno()).st_size < _MMAP_MIN_BYTES:
+            return _loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # the view must be released before the mapping closes
+            with memoryview(mm) as view:
+                try:
+                    return orjson.loads(view)
+                except orjson.JSONDecodeError:
+                    pass
+            return json.loads(mm[:])
 
 def _mem_used_pct(dev):
     mem = dev.get("memory", {}) if isinstance(dev, dict) else {}
-    tot = _mb(mem.get("total_mb"))
-    free = _mb(mem.get("free_mb"))
+    tot = to_float(mem.get("total_mb"))
+    free = to_float(mem.get("free_mb"))
     if tot is None or free is None:
         return None
     used = max(tot - free, 0.0)
@@ -51,70 +95,68 @@ def _device_info_obj(agr):
 # -------------------------
 # Healthchecks integration
 # -------------------------
-_HEALTH_RE = re.compile(r"^(?P<host>[^_]+)_.+_healthchecks\.json$", re.IGNORECASE)
+_HEALTH_SUFFIX = "_healthchecks.json"
 
-def _host_from_health_filename(p: Path) -> str | None:
-    m = _HEALTH_RE.match(p.name)
-    return m.group("host") if m else None
+def _host_from_health_filename(name: str) -> str | None:
+    """'<host>_<anything>_healthchecks.json' -> host (None if the middle part is empty)."""
+    host, _, rest = name.partition("_")
+    if host and len(rest) > len(_HEALTH_SUFFIX) and rest.endswith(_HEALTH_SUFFIX):
+        return host
+    return None
 
-def _safe_num(x):
+def _scan_json(root: Path) -> List[os.DirEntry]:
+    """Visible *.json files in root, sorted by name; one scandir instead of glob + per-path stat."""
     try:
-        return float(x)
-    except Exception:
-        return None
+        with os.scandir(root) as it:
+            entries = [e for e in it if e.name.endswith(".json") and not e.name.startswith(".") and e.is_file()]
+    except FileNotFoundError:
+        return []
+    entries.sort(key=lambda e: e.name)
+    return entries
+
+def _ok01(v) -> float:
+    return 1.0 if str(v).upper() == "OK" else 0.0
+
+def _as_is(v):
+    return v
+
+# (check, sub-block or None, ((row key, field, conv), ...)); a present check sets
+# every listed key, missing fields included (as conv(None))
+_HEALTH_SPEC = (
+    ("cpu_utilization", None, (("hc_cpu_1min", "1_min_avg", to_float), ("hc_cpu_5min", "5_min_avg", to_float),
+                               ("hc_cpu_threshold", "threshold", to_float))),
+    ("memory_utilization", None, (("hc_mem_util", "current_utilization", to_float),
+                                  ("hc_mem_threshold", "threshold", to_float))),
+    ("memory_free", None, (("hc_mem_free", "current_free", to_float), ("hc_mem_free_mb", "free_mb", to_float))),
+    ("memory_buffers", None, (("hc_mem_buffers", "current_buffers", to_float),
+                              ("hc_mem_buffers_mb", "buffers_mb", to_float))),
+    ("memory_cache", None, (("hc_mem_cache", "current_cache", to_float), ("hc_mem_cache_mb", "cache_mb", to_float))),
+    ("uptime", None, (("hc_uptime_min", "current_uptime", to_float),
+                      ("hc_uptime_min_threshold", "min_uptime", to_float))),
+    ("environment", "temperature", (("hc_env_temp", "current_temp", to_float),
+                                    ("hc_env_temp_threshold", "threshold", to_float))),
+    ("environment", "fans", (("hc_fans_status", "status", _as_is),)),
+    ("environment", "power", (("hc_power_ok", "status", _ok01),)),
+)
 
 def _merge_health(hout: Dict[str, Any], hc: Dict[str, Any]):
     """Merge a single health_checks block into accumulator for a host."""
     checks = hc.get("health_checks", {}) or {}
 
-    # CPU
-    if "cpu_utilization" in checks:
-        cpu = checks["cpu_utilization"] or {}
-        hout["hc_cpu_1min"] = _safe_num(cpu.get("1_min_avg"))
-        hout["hc_cpu_5min"] = _safe_num(cpu.get("5_min_avg"))
-        hout["hc_cpu_threshold"] = _safe_num(cpu.get("threshold"))
-
-    # Memory
-    if "memory_utilization" in checks:
-        mu = checks["memory_utilization"] or {}
-        hout["hc_mem_util"] = _safe_num(mu.get("current_utilization"))
-        hout["hc_mem_threshold"] = _safe_num(mu.get("threshold"))
-
-    if "memory_free" in checks:
-        mf = checks["memory_free"] or {}
-        hout["hc_mem_free"] = _safe_num(mf.get("current_free"))
-        hout["hc_mem_free_mb"] = _safe_num(mf.get("free_mb"))
-
-    if "memory_buffers" in checks:
-        mb = checks["memory_buffers"] or {}
-        hout["hc_mem_buffers"] = _safe_num(mb.get("current_buffers"))
-        hout["hc_mem_buffers_mb"] = _safe_num(mb.get("buffers_mb"))
-
-    if "memory_cache" in checks:
-        mc = checks["memory_cache"] or {}
-        hout["hc_mem_cache"] = _safe_num(mc.get("current_cache"))
-        hout["hc_mem_cache_mb"] = _safe_num(mc.get("cache_mb"))
-
-    # Uptime
-    if "uptime" in checks:
-        up = checks["uptime"] or {}
-        hout["hc_uptime_min"] = _safe_num(up.get("current_uptime"))
-        hout["hc_uptime_min_threshold"] = _safe_num(up.get("min_uptime"))
-
-    # Environment
+    for check, sub, fields in _HEALTH_SPEC:
+        if check not in checks:
+            continue
+        block = checks[check] or {}
+        if sub:
+            block = block.get(sub) or {}
+        for out_key, src_key, conv in fields:
+            hout[out_key] = conv(block.get(src_key))
+
+    # Derived: degrees over the temperature threshold
     if "environment" in checks:
-        ev = checks["environment"] or {}
-        temp = ev.get("temperature", {}) or {}
-        cur_t = _safe_num(temp.get("current_temp"))
-        thr_t = _safe_num(temp.get("threshold"))
-        hout["hc_env_temp"] = cur_t
-        hout["hc_env_temp_threshold"] = thr_t
+        cur_t, thr_t = hout["hc_env_temp"], hout["hc_env_temp_threshold"]
         if cur_t is not None and thr_t is not None:
             hout["hc_env_over"] = max(cur_t - thr_t, 0.0)
-        fans = ev.get("fans", {}) or {}
-        hout["hc_fans_status"] = fans.get("status")
-        power = ev.get("power", {}) or {}
-        hout["hc_power_ok"] = 1.0 if str(power.get("status","")).upper() == "OK" else 0.0
 
     # Rollup status/result
     result = checks.get("result")
@@ -142,79 +184,171 @@ def _merge_health(hout: Dict[str, Any], hc: Dict[str, Any]):
 
     hout["hc_fail_count"] = float(hout.get("hc_fail_count", 0) or 0) + fail_cnt
 
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+def _process_pool() -> ProcessPoolExecutor:
+    """
+    One pool per process, started on first use and reused by later calls.
+    Workers come from a forkserver (spawn where unavailable): forking the
+    multi-threaded app server could copy locks held by other threads.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context(method))
+        return _pool
+
+def _map_files(fn, paths: List[Path]) -> list:
+    """fn over paths, in order; fanned out to the worker pool for larger batches."""
+    if len(paths) >= _PARALLEL_MIN_FILES:
+        pool = _process_pool()
+        try:
+            return list(pool.map(fn, paths, chunksize=8))
+        except BrokenProcessPool:  # a worker died: start a fresh pool next time
+            global _pool
+            with _pool_lock:
+                if _pool is pool:
+                    _pool = None
+    return [fn(p) for p in paths]
+
+def _read_json_or_none(p: Path):
+    try:
+        return _load_json_file(p)
+    except Exception:
+        return None
+
 def load_healthchecks(dir_path: str) -> Dict[str, Dict[str, Any]]:
     """Return merged health data per host from *_healthchecks.json files."""
     root = Path(dir_path)
     agg: Dict[str, Dict[str, Any]] = {}
-    for p in sorted(root.glob("*_healthchecks.json")):
-        host = _host_from_health_filename(p)
-        if not host:
-            continue
-        try:
-            obj = json.loads(p.read_text())
-        except Exception:
+    hosts_paths = [(h, root / e.name) for e in _scan_json(root)
+                   if (h := _host_from_health_filename(e.name))]
+    # parse in parallel, merge serially (merge order matters for hc_result roll-up)
+    objs = _map_files(_read_json_or_none, [p for _, p in hosts_paths])
+    for (host, _), obj in zip(hosts_paths, objs):
+        if obj is None:
             continue
         d = agg.setdefault(host, {})
         _merge_health(d, obj)
     return agg
 
+_EXPIRED_LICENSE = frozenset(("EXPIRED", "EVAL EXPIRED", "INVALID"))
+
+def _license_status(dev):
+    return (dev.get("license") or {}).get("status", "")
+
+# Row extraction table, in output-column order: (key, fn(dev)) or ((keys...), fn(agr) -> tuple)
+_REPORT_SPEC = (
+    ("os_type", lambda dev: dev.get("os_type")),
+    ("version", lambda dev: dev.get("version")),
+    ("image", lambda dev: dev.get("nxos_image_file") or dev.get("system_image")),
+    ("model", lambda dev: (dev.get("hardware") or {}).get("model")),
+    ("serial", lambda dev: (dev.get("hardware") or {}).get("serial_number")),
+    ("license_status", lambda dev: _license_status(dev) or "UNKNOWN"),
+    ("license_expired", lambda dev: 1 if str(_license_status(dev)).upper() in _EXPIRED_LICENSE else 0),
+    ("mem_used_pct", _mem_used_pct),
+    (("iface_total", "iface_enabled", "iface_enabled_ratio"), _iface_counts),
+    (("bgp_peers", "v4nets", "v6nets", "bgp_keepalive", "bgp_hold"), _bgp_features),
+    ("uptime_days", lambda dev: (dev.get("uptime") or {}).get("days")),
+    ("uptime_hours", lambda dev: (dev.get("uptime") or {}).get("hours")),
+)
+
 def parse_report(path: Path) -> dict:
-    obj = json.loads(Path(path).read_text())
+    obj = _load_json_file(path)
     agr = obj.get("all_gathered_resources", {})
     dev = _device_info_obj(agr)
 
-    host = dev.get("device_name") or dev.get("hostname") or path.stem
-    os_type = dev.get("os_type")
-    version = dev.get("version")
-    image = dev.get("nxos_image_file") or dev.get("system_image")
-    model = (dev.get("hardware") or {}).get("model")
-    serial = (dev.get("hardware") or {}).get("serial_number")
-    lic = (dev.get("license") or {}).get("status", "")
-    lic_expired = 1 if str(lic).upper() in ("EXPIRED", "EVAL EXPIRED", "INVALID") else 0
-
-    mem_used_pct = _mem_used_pct(dev)
-    iface_total, iface_enabled, iface_ratio = _iface_counts(agr)
-    peers, v4nets, v6nets, ka, hold = _bgp_features(agr)
-
-    up = dev.get("uptime") or {}
-    uptime_d = up.get("days")
-    uptime_h = up.get("hours")
-
-    return {
-        "host": host,
-        "os_type": os_type,
-        "version": version,
-        "image": image,
-        "model": model,
-        "serial": serial,
-        "license_status": lic or "UNKNOWN",
-        "license_expired": lic_expired,
-        "mem_used_pct": mem_used_pct if mem_used_pct is not None else None,
-        "iface_total": iface_total,
-        "iface_enabled": iface_enabled,
-        "iface_enabled_ratio": iface_ratio,
-        "bgp_peers": peers,
-        "v4nets": v4nets,
-        "v6nets": v6nets,
-        "bgp_keepalive": ka,
-        "bgp_hold": hold,
-        "uptime_days": uptime_d,
-        "uptime_hours": uptime_h,
-        "source": str(path),
-        "raw": obj,
-    }
+    row = {"host": dev.get("device_name") or dev.get("hostname") or path.stem}
+    for key, fn in _REPORT_SPEC:
+        if isinstance(key, tuple):
+            row.update(zip(key, fn(agr)))
+        else:
+            row[key] = fn(dev)
+    row["source"] = str(path)
+    return row
+
+def get_raw(row: dict) -> dict:
+    """Full report for a parsed row, re-read on demand (rows don't keep it in memory)."""
+    return _load_json_file(row["source"])
+
+def _try_parse_report(path: Path) -> Tuple[dict | None, str | None]:
+    """(row, None) or (None, error) -- exceptions don't cross the process-pool boundary cleanly."""
+    try:
+        return parse_report(path), None
+    except Exception as e:
+        return None, str(e)
+
+def _read_parse_cache(cache: Path) -> Dict[str, dict]:
+    """source path -> cached row (still carrying its _mtime_ns/_size stamp); rows from other parser versions are dropped."""
+    if pq is None or not cache.is_file():
+        return {}
+    try:
+        return {r["source"]: r for r in pq.read_table(cache).to_pylist()
+                if r.get("_parser_version") == _PARSER_VERSION}
+    except Exception as e:
+        print(f"[load_dir] ignoring unreadable cache {cache.name}: {e}")
+        return {}
+
+def _write_parse_cache(cache: Path, rows: List[dict]) -> None:
+    if pq is None or not rows:
+        return
+    # Arrow would silently widen mixed columns (e.g. int + float); skip caching those sets
+    for k in rows[0]:
+        if len({type(r.get(k)) for r in rows} - {type(None)}) > 1:
+            return
+    # temp file + os.replace: concurrent load_dir calls never see a half-written cache
+    tmp = None
+    try:
+        with tempfile.NamedTemporaryFile(dir=cache.parent, prefix=cache.name, suffix=".tmp", delete=False) as f:
+            tmp = f.name
+            pq.write_table(pa.Table.from_pylist(rows), f, compression="zstd")
+        os.replace(tmp, cache)
+    except Exception as e:
+        print(f"[load_dir] could not write cache {cache.name}: {e}")
+        if tmp is not None:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
 
 def load_dir(dir_path: str) -> List[dict]:
     root = Path(dir_path)
-    rows = []
-    for p in sorted(root.glob("*.json")):
+    cache_path = root / _PARSE_CACHE
+    cached = _read_parse_cache(cache_path)
+    entries = []  # (path, stamp, cached row or None)
+    for e in _scan_json(root):
         # exclude *_healthchecks.json (handled by load_healthchecks)
-        if p.name.endswith("_healthchecks.json"):
+        if e.name.endswith(_HEALTH_SUFFIX):
             continue
-        try:
-            rows.append(parse_report(p))
-        except Exception as e:
-            print(f"[load_dir] failed {p.name}: {e}")
+        p = root / e.name
+        st = e.stat()
+        stamp = (st.st_mtime_ns, st.st_size)
+        hit = cached.get(str(p))
+        if hit is not None and tuple(hit[k] for k in _STAT_KEYS) == stamp:
+            hit = {k: v for k, v in hit.items() if k not in _CACHE_KEYS}
+        else:
+            hit = None
+        entries.append((p, stamp, hit))
+
+    misses = [p for p, _, hit in entries if hit is None]
+    parsed = dict(zip(misses, _map_files(_try_parse_report, misses)))
+    dirty = bool(misses)
+
+    rows = []
+    stamped = []
+    for p, stamp, row in entries:
+        if row is None:
+            row, err = parsed[p]
+            if err is not None:
+                print(f"[load_dir] failed {p.name}: {err}")
+                continue
+        rows.append(row)
+        stamped.append({**row, **dict(zip(_STAT_KEYS, stamp)), "_parser_version": _PARSER_VERSION})
+
+    if dirty or len(stamped) != len(cached):
+        _write_parse_cache(cache_path, stamped)
 
     # merge health data into inventory rows
     health_by_host = load_healthchecks(dir_path)
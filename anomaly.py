@@ -1,24 +1,54 @@
-import os, glob, json, pandas as pd
+import os, csv, glob, json, numpy as np, pandas as pd
 from sklearn.ensemble import IsolationForest
-def _load_many(g):
-    frames=[]; 
-    for fp in sorted(glob.glob(g)):
-        if fp.endswith('.csv'): frames.append(pd.read_csv(fp))
+try:  # optional: streaming CSV scan with column projection
+    import pyarrow as pa, pyarrow.csv as pacsv, pyarrow.dataset as pads
+except ImportError: pads=None
+try: import orjson
+except ImportError: orjson=None
+def _csv_header(fp):
+    with open(fp, newline='') as f: return tuple(next(csv.reader(f), ()))
+def _load_csvs_arrow(files, want):
+    """pyarrow scan matching the pandas path, or None (use pandas) when headers differ or column types clash across files."""
+    if len({_csv_header(fp) for fp in files})!=1: return None  # pandas takes the union of columns
+    try:
+        ds=pads.dataset(files, format='csv')
+        # read_csv leaves date/time-looking text as strings; arrow would parse it
+        temporal={f.name: pa.string() for f in ds.schema if pa.types.is_temporal(f.type)}
+        if temporal: ds=pads.dataset(files, format=pads.CsvFileFormat(convert_options=pacsv.ConvertOptions(column_types=temporal)))
+        cols=[c for c in ds.schema.names if c in want] if want else None
+        return ds.to_table(columns=cols).to_pandas()
+    except pa.ArrowInvalid: return None  # types inferred from the first file don't fit a later one
+def _load_many(g, columns=None):
+    """Load every CSV/JSON match of `g`; with `columns`, only those (present) columns are materialized."""
+    files=sorted(glob.glob(g))
+    if not files: raise FileNotFoundError(f'No files matched: {g}')
+    want=set(columns) if columns else None
+    if pads is not None and all(fp.endswith('.csv') for fp in files):
+        df=_load_csvs_arrow(files, want)
+        if df is not None: return df
+    frames=[]
+    for fp in files:
+        if fp.endswith('.csv'): frames.append(pd.read_csv(fp, usecols=(lambda c: c in want) if want else None))
         elif fp.endswith('.json'):
-            try: frames.append(pd.read_json(fp))
-            except ValueError: frames.append(pd.read_json(fp, lines=True))
+            try: df=pd.read_json(fp)
+            except ValueError: df=pd.read_json(fp, lines=True)
+            frames.append(df[[c for c in df.columns if c in want]] if want else df)
     if not frames: raise FileNotFoundError(f'No files matched: {g}')
     return pd.concat(frames, ignore_index=True)
 def isolation_forest_detect(input_glob, id_field=None, numeric_fields=None, contamination=0.1, random_state=42, output_path=None):
-    df=_load_many(input_glob)
+    df=_load_many(input_glob, columns=([id_field] if id_field else [])+list(numeric_fields) if numeric_fields else None)
     if numeric_fields is None:
         numeric_fields=[c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])]
     X=df[numeric_fields].fillna(df[numeric_fields].median(numeric_only=True))
     model=IsolationForest(contamination=contamination, random_state=random_state)
     preds=model.fit_predict(X); scores=model.score_samples(X)
-    out=df.copy(); out['_iforest_pred']=preds; out['_iforest_score']=scores; out['_is_anomaly']=preds==-1
-    anomalies=out[out['_is_anomaly']]
+    idx=np.flatnonzero(preds==-1)  # no full copy of df: only anomalous rows get the extra columns
+    anomalies=df.iloc[idx].assign(_iforest_pred=-1, _iforest_score=scores[idx], _is_anomaly=True)
     summary={'rows':len(df),'numeric_fields':numeric_fields,'contamination':contamination,'anomalies':len(anomalies)}
-    if id_field and id_field in out.columns: summary['anomalous_ids']=anomalies[id_field].tolist()[:100]
-    if output_path: os.makedirs(os.path.dirname(output_path), exist_ok=True); anomalies.to_json(output_path, orient='records', indent=2)
+    if id_field and id_field in df.columns: summary['anomalous_ids']=anomalies[id_field].tolist()[:100]
+    if output_path:
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        if orjson is None: anomalies.to_json(output_path, orient='records', indent=2)
+        else:
+            with open(output_path, 'wb') as f: f.write(orjson.dumps(anomalies.to_dict(orient='records'), default=str, option=orjson.OPT_INDENT_2|orjson.OPT_SERIALIZE_NUMPY))
     return {'summary':summary, 'preview': anomalies.head(20).to_dict(orient='records')}
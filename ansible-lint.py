@@ -1,19 +1,179 @@
 import os
 import json
-import tempfile
-import subprocess
+import asyncio
+import hashlib
+import functools
 import shutil
+import stat
+from collections import OrderedDict, defaultdict
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 from mcp.server.fastmcp import FastMCP
 
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None
+
 # Initialize FastMCP
 mcp = FastMCP("ansible-lint")
 
+@functools.lru_cache(maxsize=1)
+def _ansible_lint_path(path_env: Optional[str]) -> Optional[str]:
+    return shutil.which("ansible-lint", path=path_env)
+
 # Check if ansible-lint is available
 def check_ansible_lint_available() -> bool:
-    """Check if ansible-lint is installed and available."""
-    return shutil.which("ansible-lint") is not None
+    """Check if ansible-lint is installed and available (PATH lookup is redone only when PATH changes)."""
+    return _ansible_lint_path(os.environ.get("PATH")) is not None
+
+# Max ansible-lint runs at once (each one is a process importing ansible, ~100MB+).
+# Override with ANSIBLE_LINT_CONCURRENCY.
+LINT_CONCURRENCY = int(os.environ.get("ANSIBLE_LINT_CONCURRENCY", os.cpu_count() or 4))
+_LINT_SEM = asyncio.Semaphore(LINT_CONCURRENCY)
+
+async def _lint(args: List[str], timeout: float) -> Dict[str, Any]:
+    """{"returncode", "stdout", "stderr"} for one ansible-lint run, at most LINT_CONCURRENCY at once."""
+    async with _LINT_SEM:
+        proc = await asyncio.create_subprocess_exec(
+            "ansible-lint", *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise
+        return {
+            "returncode": proc.returncode,
+            "stdout": stdout.decode("utf-8", "replace"),
+            "stderr": stderr.decode("utf-8", "replace")
+        }
+
+# Results for inline content, keyed by sha256(ansible-lint version, cwd, args, config
+# stamps, content). Files on disk aren't cached (they can change under the same path).
+# The disk cache keeps the _CACHE_MAX most recently used results.
+_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "ansible-lint-mcp"
+_CACHE_MAX = 4096
+_HOT_MAX = 256
+_hot: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()  # in-process LRU over the disk cache
+_lint_version: Optional[str] = None
+
+# Config ansible-lint and yamllint read from the project, looked up from cwd to the project
+# root (the first directory holding .git); options naming extra config or rule dirs
+_CONFIG_NAMES = (
+    ".ansible-lint", ".ansible-lint.yml", ".ansible-lint.yaml",
+    ".config/ansible-lint.yml", ".config/ansible-lint.yaml",
+    ".yamllint", ".yamllint.yml", ".yamllint.yaml",
+)
+_CONFIG_OPTS = frozenset(("-c", "--config-file", "-r", "--rules-dir"))
+
+def _config_stamps(args: List[str]) -> List[str]:
+    """"path:mtime_ns:size" for each config file (and file under a rules dir) that can affect a lint."""
+    paths: List[Path] = []
+    cwd = Path.cwd()
+    for d in (cwd, *cwd.parents):
+        paths += [d / name for name in _CONFIG_NAMES]
+        if (d / ".git").exists():
+            break
+    for prev, arg in zip([None, *args], args):
+        opt, eq, value = arg.partition("=")
+        if prev in _CONFIG_OPTS:
+            paths.append(Path(arg))
+        elif eq and opt in _CONFIG_OPTS:
+            paths.append(Path(value))
+    if os.environ.get("YAMLLINT_CONFIG_FILE"):
+        paths.append(Path(os.environ["YAMLLINT_CONFIG_FILE"]))
+
+    stamps = []
+    for p in paths:
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        if stat.S_ISDIR(st.st_mode):
+            for root, dirs, files in os.walk(p):
+                dirs.sort()
+                for name in sorted(files):
+                    paths.append(Path(root, name))  # stamped when the loop reaches them
+            continue
+        stamps.append(f"{p}:{st.st_mtime_ns}:{st.st_size}")
+    return stamps
+
+async def _cache_key(args: List[str], content: str) -> Optional[str]:
+    global _lint_version
+    if _lint_version is None:
+        res = await _lint(["--version"], timeout=60)
+        if res["returncode"] != 0:
+            return None
+        _lint_version = res["stdout"].strip()
+    h = hashlib.sha256()
+    # arg order is significant (e.g. "--tags x"), so args are hashed as given
+    for part in (_lint_version, os.getcwd(), json.dumps(args), *_config_stamps(args), content):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+def _cache_path(key: str) -> Path:
+    return _CACHE_DIR / key[:2] / f"{key}.json"
+
+def _cache_get(key: str) -> Optional[Dict[str, Any]]:
+    if key in _hot:
+        _hot.move_to_end(key)
+        return _hot[key]
+    path = _cache_path(key)
+    try:
+        result = json.loads(path.read_bytes())
+        os.utime(path)  # mtime is the recency _cache_prune evicts by
+    except (OSError, ValueError):
+        return None
+    _cache_remember(key, result)
+    return result
+
+def _cache_remember(key: str, result: Dict[str, Any]):
+    _hot[key] = result
+    _hot.move_to_end(key)
+    if len(_hot) > _HOT_MAX:
+        _hot.popitem(last=False)
+
+def _cache_put(key: str, result: Dict[str, Any]):
+    _cache_remember(key, result)
+    path = _cache_path(key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # write-then-rename so concurrent readers never see a partial file
+        import tempfile  # deferred, like the other inline-content-only paths
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(result, f)
+        os.replace(tmp, path)
+    except OSError:
+        return
+    _cache_prune()
+
+def _cache_prune():
+    """Delete the least recently used disk results beyond _CACHE_MAX."""
+    entries = []
+    try:
+        for sub in os.scandir(_CACHE_DIR):
+            if sub.is_dir():
+                entries += [(e.stat().st_mtime_ns, e.path) for e in os.scandir(sub.path) if e.name.endswith(".json")]
+    except OSError:
+        return
+    if len(entries) <= _CACHE_MAX:
+        return
+    entries.sort()
+    for _, path in entries[:len(entries) - _CACHE_MAX]:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+# Inline content is written to tmpfs when available (no disk I/O for a file that lives
+# for one lint); None means the system temp dir
+_TMP_DIR = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
 
 # Helper function to run ansible-lint commands
 async def run_ansible_lint(args: List[str], input_content: str = None) -> Dict[str, Any]:
@@ -24,44 +184,38 @@ async def run_ansible_lint(args: List[str], input_content: str = None) -> Dict[s
             "success": False
         }
     
-    cmd = ["ansible-lint"] + args
+    args = list(args)
+    temp_file_path = None
+    cache_key = None
     
     try:
         if input_content:
+            cache_key = await _cache_key(args, input_content)
+            cached = _cache_get(cache_key) if cache_key else None
+            if cached is not None:
+                return {**cached, "success": True}
+            
+            import tempfile  # deferred: path-based tools never need it
+            
             # Create temporary file for content
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.yml', delete=False) as temp_file:
+            with tempfile.NamedTemporaryFile(mode='w', suffix='.yml', dir=_TMP_DIR, delete=False) as temp_file:
                 temp_file.write(input_content)
                 temp_file_path = temp_file.name
             
             # Add temp file to command
-            cmd.append(temp_file_path)
-            
-            try:
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=60
-                )
-            finally:
-                # Clean up temp file
-                os.unlink(temp_file_path)
-        else:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
+            args.append(temp_file_path)
+        
+        result = await _lint(args, timeout=60)
+        success = result["returncode"] in [0, 2]  # 0 = no issues, 2 = issues found
+        if success and cache_key:
+            _cache_put(cache_key, result)
         
         return {
-            "returncode": result.returncode,
-            "stdout": result.stdout,
-            "stderr": result.stderr,
-            "success": result.returncode in [0, 2]  # 0 = no issues, 2 = issues found
+            **result,
+            "success": success
         }
     
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         return {
             "error": "ansible-lint command timed out after 60 seconds",
             "success": False
@@ -71,16 +225,60 @@ async def run_ansible_lint(args: List[str], input_content: str = None) -> Dict[s
             "error": f"Failed to run ansible-lint: {str(e)}",
             "success": False
         }
+    finally:
+        # Clean up temp file
+        if temp_file_path:
+            os.unlink(temp_file_path)
+
+def _loads(output: str) -> Any:
+    """orjson when available (large analyze_project reports); stdlib json otherwise."""
+    if orjson is not None:
+        return orjson.loads(output)
+    return json.loads(output)
+
+# Output formats that are JSON documents (json = codeclimate issue list, sarif = SARIF log)
+_JSON_FORMATS = frozenset(("json", "sarif"))
 
 def parse_lint_output(output: str, format_type: str = "json") -> Dict[str, Any]:
     """Parse ansible-lint output based on format type."""
-    if format_type == "json":
-        try:
-            return json.loads(output) if output.strip() else []
-        except json.JSONDecodeError:
-            return {"error": "Failed to parse JSON output", "raw_output": output}
-    else:
+    if format_type not in _JSON_FORMATS:
         return {"raw_output": output}
+    if not output or output.isspace():  # no copy, unlike strip()
+        return [] if format_type == "json" else {}
+    try:
+        return _loads(output)
+    except ValueError:  # json.JSONDecodeError and orjson.JSONDecodeError both subclass it
+        return {"error": "Failed to parse JSON output", "raw_output": output}
+
+def _issue_dicts(parsed_output: Any) -> List[Dict[str, Any]]:
+    """The issue dicts of a parsed JSON report (anything else ansible-lint emitted is skipped)."""
+    if not isinstance(parsed_output, list):
+        return []
+    return [issue for issue in parsed_output if isinstance(issue, dict)]
+
+def _group_issues(issues: List[Dict[str, Any]], keys: List[str], groups=None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Bucket issues by a precomputed key column (keys[i] belongs to issues[i]).
+    Callers pull the field they group on out in one list pass, then this loop is plain zip.
+    """
+    groups = defaultdict(list) if groups is None else groups
+    for key, issue in zip(keys, issues):
+        groups[key].append(issue)
+    return groups
+
+_PROFILES = ("min", "basic", "moderate", "safety", "shared", "production")
+_FORMATS = ("json", "brief", "full", "sarif")
+
+def _format_profile_argv(format_type: str, profile: Optional[str]) -> tuple:
+    return (f"--format={format_type}",) + (("--profile", profile) if profile else ())
+
+# Prebuilt leading argv for every known (format, profile) pair
+_ARGV = {(f, p): _format_profile_argv(f, p) for f in _FORMATS for p in _PROFILES}
+
+def _base_args(format_type: str, profile: Optional[str]) -> List[str]:
+    """Fresh `--format=... [--profile ...]` argv list for callers to append to."""
+    argv = _ARGV.get((format_type, profile))
+    return list(argv if argv is not None else _format_profile_argv(format_type, profile))
 
 @mcp.tool()
 async def lint_playbook(
@@ -98,10 +296,7 @@ async def lint_playbook(
         format_type: Output format (json, brief, full, sarif)
         rules: Specific rules to check (optional)
     """
-    args = [f"--format={format_type}"]
-    
-    if profile:
-        args.extend(["--profile", profile])
+    args = _base_args(format_type, profile)
     
     if rules:
         args.extend(["--tags", ",".join(rules)])
@@ -148,11 +343,7 @@ async def lint_file(
             "success": False
         }
     
-    args = [f"--format={format_type}"]
-    
-    if profile:
-        args.extend(["--profile", profile])
-    
+    args = _base_args(format_type, profile)
     args.append(file_path)
     
     result = await run_ansible_lint(args)
@@ -178,6 +369,82 @@ async def lint_file(
         }
     }
 
+@mcp.tool()
+async def lint_files(
+    paths: List[str],
+    profile: str = "basic",
+    format_type: str = "json"
+) -> Any:
+    """
+    Lint several Ansible files in a single ansible-lint run and return issues per file.
+    Prefer this over calling lint_file in a loop: ansible-lint start-up is paid once, not per file.
+    
+    Args:
+        paths: Paths to the Ansible files to lint
+        profile: Quality profile to use
+        format_type: Output format (issues are only split per file for json)
+    """
+    missing = [p for p in paths if not os.path.exists(p)]
+    if missing:
+        return {
+            "error": f"File(s) not found: {', '.join(missing)}",
+            "success": False
+        }
+    
+    args = _base_args(format_type, profile)
+    args.extend(paths)
+    
+    result = await run_ansible_lint(args)
+    
+    if not result["success"]:
+        return {
+            "error": result.get("error", "ansible-lint failed"),
+            "stderr": result.get("stderr", ""),
+            "success": False
+        }
+    
+    parsed_output = parse_lint_output(result["stdout"], format_type)
+    
+    # Split issues by the file ansible-lint reports them against
+    issues = _issue_dicts(parsed_output)
+    issues_by_file = _group_issues(issues, [issue.get("filename", "unknown") for issue in issues])
+    
+    return {
+        "success": True,
+        "file_paths": paths,
+        "issues": parsed_output,
+        "issues_by_file": dict(issues_by_file),
+        "profile_used": profile,
+        "format": format_type,
+        "summary": {
+            "total_issues": len(parsed_output) if isinstance(parsed_output, list) else 0,
+            "files_linted": len(paths),
+            "files_with_issues": len(issues_by_file),
+            "return_code": result["returncode"]
+        }
+    }
+
+def _stat_or_none(path: str) -> Optional[os.stat_result]:
+    """One stat() answering both "exists?" and "is it a directory?"."""
+    try:
+        return os.stat(path)
+    except (OSError, ValueError):
+        return None
+
+def _scan_entries(dir_path: str) -> Dict[str, os.DirEntry]:
+    """Name -> DirEntry for one directory listing (is_dir()/stat() reuse the scan's data).
+    Broken symlinks are left out, as os.path.exists would."""
+    entries = {}
+    try:
+        with os.scandir(dir_path) as it:
+            for entry in it:
+                if entry.is_symlink() and not os.path.exists(entry.path):
+                    continue
+                entries[entry.name] = entry
+    except OSError:
+        pass
+    return entries
+
 @mcp.tool()
 async def lint_role(role_path: str, profile: str = "basic") -> Any:
     """
@@ -187,23 +454,20 @@ async def lint_role(role_path: str, profile: str = "basic") -> Any:
         role_path: Path to the Ansible role directory
         profile: Quality profile to use
     """
-    if not os.path.exists(role_path):
+    st = _stat_or_none(role_path)
+    if st is None:
         return {
             "error": f"Role path not found: {role_path}",
             "success": False
         }
     
-    if not os.path.isdir(role_path):
+    if not stat.S_ISDIR(st.st_mode):
         return {
             "error": f"Path is not a directory: {role_path}",
             "success": False
         }
     
-    args = ["--format=json"]
-    
-    if profile:
-        args.extend(["--profile", profile])
-    
+    args = _base_args("json", profile)
     args.append(role_path)
     
     result = await run_ansible_lint(args)
@@ -221,11 +485,13 @@ async def lint_role(role_path: str, profile: str = "basic") -> Any:
     role_structure = {}
     role_dirs = ["tasks", "handlers", "vars", "defaults", "meta", "templates", "files"]
     
+    entries = _scan_entries(role_path)
+    
     for dir_name in role_dirs:
-        dir_path = os.path.join(role_path, dir_name)
+        entry = entries.get(dir_name)
         role_structure[dir_name] = {
-            "exists": os.path.exists(dir_path),
-            "files": list(os.listdir(dir_path)) if os.path.exists(dir_path) else []
+            "exists": entry is not None,
+            "files": os.listdir(entry.path) if entry is not None and entry.is_dir() else []
         }
     
     return {
@@ -287,6 +553,28 @@ async def list_tags() -> Any:
         "tags_output": result["stdout"]
     }
 
+def _yaml_syntax_error(content: str) -> Optional[Dict[str, Any]]:
+    """
+    Issue dict for content that isn't well-formed YAML, else None.
+    Only composes the node graph (no object construction), so Ansible tags
+    like !vault / !unsafe don't count as errors.
+    """
+    import yaml  # deferred: only this tool needs it
+    
+    try:
+        # libyaml's C loader when PyYAML was built with it
+        for _ in yaml.compose_all(content, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader)):
+            pass
+    except yaml.YAMLError as e:
+        mark = getattr(e, "problem_mark", None)
+        return {
+            "tag": "syntax",
+            "error": str(e),
+            "line": mark.line + 1 if mark else None,
+            "column": mark.column + 1 if mark else None
+        }
+    return None
+
 @mcp.tool()
 async def validate_syntax(content: str) -> Any:
     """
@@ -295,6 +583,18 @@ async def validate_syntax(content: str) -> Any:
     Args:
         content: YAML content to validate
     """
+    # Malformed YAML is reported without starting ansible-lint at all
+    yaml_error = _yaml_syntax_error(content)
+    if yaml_error:
+        return {
+            "success": True,
+            "syntax_valid": False,
+            "syntax_issues": [yaml_error],
+            "summary": {
+                "total_syntax_issues": 1
+            }
+        }
+    
     # Use only syntax-related rules for faster checking
     args = ["--format=json", "--tags", "syntax"]
     
@@ -319,6 +619,22 @@ async def validate_syntax(content: str) -> Any:
         }
     }
 
+# Substring markers per severity; a rule id matches when it contains one (e.g. "name[casing]")
+_CRITICAL_RULES = ("syntax-check", "load-failure")
+_MAJOR_RULES = ("risky-shell-pipe", "command-instead-of-module")  # production only
+_MINOR_RULES = ("name", "yaml")
+
+@functools.lru_cache(maxsize=1024)
+def _issue_category(rule_id: str, production: bool) -> str:
+    """Severity bucket for a rule id; memoized, since a report repeats few distinct ids."""
+    if any(marker in rule_id for marker in _CRITICAL_RULES):
+        return "critical"
+    if production and any(marker in rule_id for marker in _MAJOR_RULES):
+        return "major"
+    if any(marker in rule_id for marker in _MINOR_RULES):
+        return "minor"
+    return "info"
+
 @mcp.tool()
 async def check_best_practices(
     content: str, 
@@ -341,7 +657,7 @@ async def check_best_practices(
     }
     
     profile = profile_mapping.get(context, "basic")
-    args = [f"--format=json", "--profile", profile]
+    args = _base_args("json", profile)
     
     if exclude_rules:
         args.extend(["--skip-list", ",".join(exclude_rules)])
@@ -365,18 +681,14 @@ async def check_best_practices(
         "info": []
     }
     
-    for issue in parsed_output:
-        if isinstance(issue, dict):
-            # Categorize based on rule type and context
-            rule_id = issue.get("rule", {}).get("id", "")
-            if any(critical_rule in rule_id for critical_rule in ["syntax-check", "load-failure"]):
-                categorized_issues["critical"].append(issue)
-            elif context == "production" and any(major_rule in rule_id for major_rule in ["risky-shell-pipe", "command-instead-of-module"]):
-                categorized_issues["major"].append(issue)
-            elif any(minor_rule in rule_id for minor_rule in ["name", "yaml"]):
-                categorized_issues["minor"].append(issue)
-            else:
-                categorized_issues["info"].append(issue)
+    # Categorize based on rule type and context
+    production = context == "production"
+    issues = _issue_dicts(parsed_output)
+    rule_ids = [issue.get("rule", {}).get("id", "") for issue in issues]
+    _group_issues(issues, [_issue_category(rule_id, production) for rule_id in rule_ids], categorized_issues)
+    
+    counts = {category: len(issues) for category, issues in categorized_issues.items()}
+    blocking = counts["critical"] > 0 or counts["major"] > 0
     
     return {
         "success": True,
@@ -386,14 +698,11 @@ async def check_best_practices(
         "categorized_issues": categorized_issues,
         "summary": {
             "total_issues": len(parsed_output),
-            "critical": len(categorized_issues["critical"]),
-            "major": len(categorized_issues["major"]),
-            "minor": len(categorized_issues["minor"]),
-            "info": len(categorized_issues["info"])
+            **counts
         },
         "recommendations": {
-            "ready_for_production": len(categorized_issues["critical"]) == 0 and len(categorized_issues["major"]) == 0,
-            "next_steps": "Fix critical and major issues before deploying to production" if len(categorized_issues["critical"]) > 0 or len(categorized_issues["major"]) > 0 else "Code meets basic quality standards"
+            "ready_for_production": not blocking,
+            "next_steps": "Fix critical and major issues before deploying to production" if blocking else "Code meets basic quality standards"
         }
     }
 
@@ -406,19 +715,21 @@ async def analyze_project(project_path: str, profile: str = "moderate") -> Any:
         project_path: Path to the Ansible project directory
         profile: Quality profile to use for analysis
     """
-    if not os.path.exists(project_path):
+    st = _stat_or_none(project_path)
+    if st is None:
         return {
             "error": f"Project path not found: {project_path}",
             "success": False
         }
     
-    if not os.path.isdir(project_path):
+    if not stat.S_ISDIR(st.st_mode):
         return {
             "error": f"Path is not a directory: {project_path}",
             "success": False
         }
     
-    args = ["--format=json", "--profile", profile, project_path]
+    args = _base_args("json", profile)
+    args.append(project_path)
     
     result = await run_ansible_lint(args)
     
@@ -440,28 +751,26 @@ async def analyze_project(project_path: str, profile: str = "moderate") -> Any:
         "ansible.cfg", "requirements.yml", "site.yml"
     ]
     
+    entries = _scan_entries(project_path)
+    
     for path in common_paths:
-        full_path = os.path.join(project_path, path)
-        if os.path.exists(full_path):
-            if os.path.isdir(full_path):
-                project_structure[path] = {
-                    "type": "directory",
-                    "contents": os.listdir(full_path)
-                }
-            else:
-                project_structure[path] = {
-                    "type": "file",
-                    "size": os.path.getsize(full_path)
-                }
+        entry = entries.get(path)
+        if entry is None:
+            continue
+        if entry.is_dir():
+            project_structure[path] = {
+                "type": "directory",
+                "contents": os.listdir(entry.path)
+            }
+        else:
+            project_structure[path] = {
+                "type": "file",
+                "size": entry.stat().st_size
+            }
     
     # Categorize issues by file
-    issues_by_file = {}
-    for issue in parsed_output:
-        if isinstance(issue, dict):
-            filename = issue.get("filename", "unknown")
-            if filename not in issues_by_file:
-                issues_by_file[filename] = []
-            issues_by_file[filename].append(issue)
+    issues = _issue_dicts(parsed_output)
+    issues_by_file = dict(_group_issues(issues, [issue.get("filename", "unknown") for issue in issues]))
     
     return {
         "success": True,
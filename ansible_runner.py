@@ -1,8 +1,27 @@
 # ansible_runner.py
-import os, json, shlex, subprocess, sys, tempfile
+import asyncio, collections, os, json, re, shlex, subprocess, sys, tempfile
+
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None
+
+def _dumps(obj) -> bytes:
+    """UTF-8 JSON; orjson when available, stdlib for anything it can't serialize (e.g. int keys)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            pass
+    return json.dumps(obj).encode("utf-8")
+
+# ANSIBLE_RUNNER_DEBUG=1 adds "env_debug" (the effective Ansible env) to every result
+DEBUG = bool(os.environ.get("ANSIBLE_RUNNER_DEBUG"))
 
 BASE = os.path.abspath(os.path.dirname(__file__))
 PLAYBOOKS_DIR = os.path.join(BASE, "playbooks")
+DEFAULT_OUTPUT_DIR = os.path.join(BASE, "outputs")
+DEFAULT_ANSIBLE_CONFIG = os.path.join(PLAYBOOKS_DIR, "ansible.cfg")
 
 def _venv_bin():
     # Prefer the Python actually running this process
@@ -10,30 +29,49 @@ def _venv_bin():
     vbin = os.path.dirname(exe)
     return vbin
 
-def run_playbook(playbook_path, inventory=None, extra_vars=None, output_dir=None, timeout=1800):
-    playbook_path = os.path.abspath(playbook_path)
-    workdir = os.path.dirname(playbook_path) or PLAYBOOKS_DIR
-    output_dir = os.path.abspath(output_dir or os.path.join(BASE, "outputs"))
-    os.makedirs(output_dir, exist_ok=True)
+VENV_BIN = _venv_bin()
+ANSIBLE_PLAYBOOK = os.path.join(VENV_BIN, "ansible-playbook")
 
+def _build_env():
     # Build env that mirrors your working CLI environment
     env = os.environ.copy()
-    vbin = _venv_bin()
+    vbin = VENV_BIN
     env.setdefault("VIRTUAL_ENV", os.path.dirname(vbin))
     env["PATH"] = f"{vbin}:{env.get('PATH','')}"
-    env.setdefault("ANSIBLE_CONFIG", os.path.join(PLAYBOOKS_DIR, "ansible.cfg"))
+    env.setdefault("ANSIBLE_CONFIG", DEFAULT_ANSIBLE_CONFIG)
     # Your collections live here:
     env.setdefault("ANSIBLE_COLLECTIONS_PATHS", "/home/rothakur/dev-workspace/ansible_collections")
     env.setdefault("ANSIBLE_PYTHON_INTERPRETER", sys.executable)
+    return env
+
+# Built once at import and shared read-only by every run: later os.environ changes
+# are not seen by playbook runs
+_ENV = _build_env()
 
-    ansible_playbook = os.path.join(vbin, "ansible-playbook")
+def _output_dir(output_dir):
+    """Absolute, existing output dir (created if missing)."""
+    path = os.path.abspath(output_dir or DEFAULT_OUTPUT_DIR)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def _write_extra_vars(extra, output_dir):
+    with tempfile.NamedTemporaryFile(prefix="extra_vars_", suffix=".json", dir=output_dir, delete=False) as tf:
+        tf.write(_dumps(extra))
+    return tf.name
+
+def _prepare(playbook_path, inventory, extra_vars, output_dir):
+    """Resolve paths, build the env and the ansible-playbook command line."""
+    playbook_path = os.path.abspath(playbook_path)
+    workdir = os.path.dirname(playbook_path) or PLAYBOOKS_DIR
+    output_dir = _output_dir(output_dir)
+
+    env = _ENV
+    ansible_playbook = ANSIBLE_PLAYBOOK
 
     extra_vars_path = None
     extra = extra_vars or {}
     if extra:
-        fd, extra_vars_path = tempfile.mkstemp(prefix="extra_vars_", suffix=".json", dir=output_dir)
-        os.write(fd, json.dumps(extra).encode("utf-8"))
-        os.close(fd)
+        extra_vars_path = _write_extra_vars(extra, output_dir)
 
     cmd = [ansible_playbook, playbook_path]
     if inventory:
@@ -41,6 +79,34 @@ def run_playbook(playbook_path, inventory=None, extra_vars=None, output_dir=None
     if extra_vars_path:
         cmd += ["-e", f"@{extra_vars_path}"]
 
+    return cmd, workdir, env, output_dir, ansible_playbook, extra_vars_path
+
+def _result(cmd, rc, stdout, stderr, workdir, env, output_dir, ansible_playbook, extra_vars_path):
+    res = {
+        "command": shlex.join(cmd),
+        "rc": rc,
+        "stdout": stdout,
+        "stderr": stderr,
+        "workdir": workdir,
+        "output_dir": output_dir,
+        "ansible_playbook": ansible_playbook,
+        "python": sys.executable,
+        "extra_vars_path": extra_vars_path,
+    }
+    if DEBUG:
+        # helpful for debugging
+        res["env_debug"] = {
+            "VIRTUAL_ENV": env.get("VIRTUAL_ENV"),
+            "ANSIBLE_CONFIG": env.get("ANSIBLE_CONFIG"),
+            "ANSIBLE_COLLECTIONS_PATHS": env.get("ANSIBLE_COLLECTIONS_PATHS"),
+            "PATH_head": env.get("PATH","").split(":")[:3],
+        }
+    return res
+
+def run_playbook(playbook_path, inventory=None, extra_vars=None, output_dir=None, timeout=1800):
+    cmd, workdir, env, output_dir, ansible_playbook, extra_vars_path = _prepare(
+        playbook_path, inventory, extra_vars, output_dir)
+
     # Ensure timeout is an int (fixes the `'float' object cannot be interpreted as an integer` crash)
     tmo = int(timeout)
 
@@ -54,22 +120,79 @@ def run_playbook(playbook_path, inventory=None, extra_vars=None, output_dir=None
         timeout=tmo,
     )
 
-    res = {
-        "command": " ".join(shlex.quote(c) for c in cmd),
-        "rc": proc.returncode,
-        "stdout": proc.stdout,
-        "stderr": proc.stderr,
-        "workdir": workdir,
-        "output_dir": output_dir,
-        "ansible_playbook": ansible_playbook,
-        "python": sys.executable,
-        # helpful for debugging
-        "env_debug": {
-            "VIRTUAL_ENV": env.get("VIRTUAL_ENV"),
-            "ANSIBLE_CONFIG": env.get("ANSIBLE_CONFIG"),
-            "ANSIBLE_COLLECTIONS_PATHS": env.get("ANSIBLE_COLLECTIONS_PATHS"),
-            "PATH_head": env.get("PATH","").split(":")[:3],
-        },
-        "extra_vars_path": extra_vars_path,
-    }
+    return _result(cmd, proc.returncode, proc.stdout, proc.stderr,
+                   workdir, env, output_dir, ansible_playbook, extra_vars_path)
+
+# run_playbook_async keeps only the last TAIL_LINES lines of each stream in memory
+TAIL_LINES = 5000
+_LINE_LIMIT = 1 << 20  # longest line read whole; longer ones are dropped from the tail
+_RECAP_HOST = re.compile(r"^(\S+)\s+:\s+((?:\w+=\d+\s*)+)$")
+_RECAP_KV = re.compile(r"(\w+)=(\d+)")
+
+class _StreamTail:
+    """Bounded tail of a process stream, plus PLAY RECAP counters parsed as lines go by."""
+
+    def __init__(self):
+        self.lines = collections.deque(maxlen=TAIL_LINES)
+        self.total = 0
+        self.stats = {}
+        self._in_recap = False
+
+    def feed(self, line: str):
+        self.total += 1
+        self.lines.append(line)
+        if line.startswith("PLAY RECAP"):
+            self._in_recap = True
+        elif self._in_recap and (m := _RECAP_HOST.match(line.strip())):
+            self.stats[m.group(1)] = {k: int(v) for k, v in _RECAP_KV.findall(m.group(2))}
+
+    async def consume(self, stream: asyncio.StreamReader):
+        while True:
+            try:
+                raw = await stream.readline()
+            except ValueError:  # line over _LINE_LIMIT; the reader already discarded it
+                self.feed("[line truncated]")
+                continue
+            if not raw:
+                return
+            self.feed(raw.decode("utf-8", "replace").rstrip("\n"))
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+async def run_playbook_async(playbook_path, inventory=None, extra_vars=None, output_dir=None, timeout=1800):
+    """
+    run_playbook without blocking the event loop; raises subprocess.TimeoutExpired the same way.
+    Output is streamed rather than buffered: "stdout"/"stderr" hold the last TAIL_LINES lines
+    (see "stdout_lines"/"stderr_lines" for full counts) and "stats" has the per-host PLAY RECAP.
+    """
+    cmd, workdir, env, output_dir, ansible_playbook, extra_vars_path = _prepare(
+        playbook_path, inventory, extra_vars, output_dir)
+    tmo = int(timeout)
+
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        cwd=workdir,
+        env=env,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        limit=_LINE_LIMIT,
+    )
+    out, err = _StreamTail(), _StreamTail()
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(out.consume(proc.stdout), err.consume(proc.stderr), proc.wait()),
+            timeout=tmo,
+        )
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise subprocess.TimeoutExpired(cmd, tmo) from None
+
+    res = _result(cmd, proc.returncode, out.text, err.text,
+                  workdir, env, output_dir, ansible_playbook, extra_vars_path)
+    res["stdout_lines"] = out.total
+    res["stderr_lines"] = err.total
+    res["stats"] = out.stats
     return res
@@ -1,59 +1,194 @@
 from __future__ import annotations
 
+import contextlib
 import datetime
+import functools
 import json
+import os
+import shutil
 import time
 from pathlib import Path
 from typing import List, Optional
 
+import anyio
+import numpy as np
 from fastapi import FastAPI, Request, UploadFile, File, Form, HTTPException
-from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse, FileResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse, FileResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import Markup, escape
+from agent._coerce import to_float_column
 from agent.loader import load_dir, load_healthchecks
 
 # from agent.detector import detect_outliers
+from agent.detector import detect_outliers_iforest, detect_outliers_iqr, iforest_mask, iqr_mask, FeatureFrame
 from agent.actions import suggest_actions
 from agent.runner import execute_plan
 
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None
+
+def _loads(data):
+    """orjson when available; stdlib json for anything it rejects (e.g. NaN literals)."""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+def _dumps(obj, sort_keys: bool = False) -> bytes:
+    """Indented UTF-8 JSON; orjson when available, stdlib for anything it can't serialize."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | (orjson.OPT_SORT_KEYS if sort_keys else 0))
+        except TypeError:
+            pass
+    return json.dumps(obj, indent=2, sort_keys=sort_keys).encode("utf-8")
+
+# IsolationForest tree-building threads per process (-1 = all cores); lower it
+# when running several uvicorn workers so they don't oversubscribe the CPU.
+IFOREST_N_JOBS = int(os.environ.get("IFOREST_N_JOBS", "-1"))
+
 # -----------------------------------------------------------------------------
 # Paths
 # -----------------------------------------------------------------------------
 BASE = Path(__file__).parent.resolve()
 UPLOADS = (BASE / "uploads").resolve()
 SAMPLES = (BASE / "sample_reports").resolve()
-UPLOADS.mkdir(parents=True, exist_ok=True)
-SAMPLES.mkdir(parents=True, exist_ok=True)
+JINJA_CACHE = BASE / ".jinja_cache"
 
-app = FastAPI(title="Network AI Agent — Local Demo")
+# -----------------------------------------------------------------------------
+# Parsed-upload cache
+# -----------------------------------------------------------------------------
+# (loader, dir) -> (signature, result); reused until any *.json in the dir is
+# added, removed or rewritten. Changed files are then re-parsed by the loader,
+# which keeps its own per-file (mtime, size) cache.
+_LOAD_CACHE: dict = {}
+
+def _json_signature(root: Path) -> tuple:
+    """(name, mtime_ns, size) of every *.json in root: one scandir, no file reads."""
+    try:
+        with os.scandir(root) as it:
+            sig = []
+            for e in it:
+                if e.name.endswith(".json"):
+                    st = e.stat()
+                    sig.append((e.name, st.st_mtime_ns, st.st_size))
+    except FileNotFoundError:
+        return ()
+    sig.sort()
+    return tuple(sig)
+
+def _cached_load(loader, root: Path):
+    key = (loader.__name__, root)
+    sig = _json_signature(root)
+    hit = _LOAD_CACHE.get(key)
+    if hit is None or hit[0] != sig:
+        hit = (sig, loader(str(root)))
+        _LOAD_CACHE[key] = hit
+    return hit[1]
+
+def _index_rows(root: str):
+    """load_dir(root) plus a host -> row index (first row wins, as a linear scan would)."""
+    rows = load_dir(root)
+    by_host: dict = {}
+    for r in rows:
+        by_host.setdefault(r.get("host"), r)
+    return rows, by_host
+
+def load_rows() -> List[dict]:
+    """load_dir(UPLOADS), cached; rows are per-call copies since detectors annotate them."""
+    return [dict(r) for r in _cached_load(_index_rows, UPLOADS)[0]]
+
+def row_for_host(host) -> Optional[dict]:
+    """The merged loader row for `host` (a copy), or None."""
+    r = _cached_load(_index_rows, UPLOADS)[1].get(host)
+    return dict(r) if r is not None else None
+
+def load_health() -> dict:
+    """load_healthchecks(UPLOADS), cached (read-only for callers)."""
+    return _cached_load(load_healthchecks, UPLOADS)
+
+@contextlib.asynccontextmanager
+async def _lifespan(app: FastAPI):
+    _setup_dirs()
+    _preload_templates()
+    _warm_detectors()
+    yield
+
+app = FastAPI(title="Network AI Agent — Local Demo", lifespan=_lifespan)
 templates = Jinja2Templates(directory=str(BASE / "templates"))
 
-import requests
-import yaml
+# Templates compile once per process; set APP_TEMPLATES_RELOAD=1 while editing them.
+templates.env.auto_reload = bool(os.environ.get("APP_TEMPLATES_RELOAD"))
+
+def _setup_dirs() -> None:
+    """Startup (not import) time: create the data dirs and attach the template bytecode cache."""
+    for d in (UPLOADS, SAMPLES):
+        d.mkdir(parents=True, exist_ok=True)
+    try:
+        JINJA_CACHE.mkdir(exist_ok=True)
+        templates.env.bytecode_cache = FileSystemBytecodeCache(str(JINJA_CACHE))
+    except OSError:  # read-only checkout: compile in memory only
+        pass
+
+def _warm_detectors() -> None:
+    """
+    One tiny fit at startup so sklearn/numpy extension modules and thread pools
+    are loaded before the first /scan (a single row would be dropped as zero-variance).
+    """
+    warm = [
+        {"host": f"_warm{i}", "iface_total": 4 + i, "iface_enabled_ratio": 1.0 - i / 10,
+         "mem_used_pct": 10.0 * i, "license_expired": i % 2}
+        for i in range(8)
+    ]
+    try:
+        detect_outliers_iforest(warm, contamination=0.2, random_state=42)
+    except Exception:
+        pass  # warm-up only; a real failure surfaces on the request that hits it
+
+def _preload_templates() -> None:
+    """Compile every template at startup so the first request doesn't pay for it."""
+    for name in templates.env.list_templates(extensions=["html"]):
+        templates.env.get_template(name)
+
 from urllib.parse import urlparse
 
+def _host_of(data: dict, fallback: str, flat: bool = False) -> str:
+    """
+    all_gathered_resources.device_info.device_name, else top-level "host", else fallback.
+    flat=True also accepts a top-level device_info (reports without all_gathered_resources).
+    """
+    agr = data.get("all_gathered_resources", data if flat else {})
+    return agr.get("device_info", {}).get("device_name") or data.get("host") or fallback
+
 def _guess_host_name(data: dict, fallback: str) -> str:
     """Best-effort host name for per-host file naming."""
-    return (
-        data.get("all_gathered_resources", {})
-            .get("device_info", {})
-            .get("device_name")
-        or data.get("host")
-        or Path(fallback).stem
-    )
+    return _host_of(data, Path(fallback).stem)
 
 def _save_host_json(data: dict, hint_name: str, out_dir: str) -> str:
     host = _guess_host_name(data, hint_name)
     path = os.path.join(out_dir, f"{host}_inventory.json")
-    with open(path, "w") as f:
-        json.dump(data, f, indent=2)
+    Path(path).write_bytes(_dumps(data))
     return path
 
 def _fetch_text(url: str, timeout: int = 30) -> str:
     """Fetch raw text; no special auth needed for public raw URLs."""
+    import requests  # deferred: only URL ingestion needs it
     r = requests.get(url, timeout=timeout)
     r.raise_for_status()
     return r.text
 
+def _json_docs(obj) -> list:
+    if isinstance(obj, list):
+        return [d for d in obj if isinstance(d, dict)]
+    if isinstance(obj, dict):
+        return [obj]
+    return [{"_raw": obj}]
+
 def _parse_payload(text: str, filename_hint: str):
     """
     Parse YAML/JSON text. Supports:
@@ -65,20 +200,20 @@ def _parse_payload(text: str, filename_hint: str):
     name = filename_hint.lower()
     docs: list[dict] = []
 
-    # JSON first if obvious
+    # JSON first if obvious (by name, or by shape: YAML-named files are often JSON)
     if name.endswith(".json"):
-        obj = json.loads(text)
-        if isinstance(obj, list):
-            docs = [d for d in obj if isinstance(d, dict)]
-        elif isinstance(obj, dict):
-            docs = [obj]
-        else:
-            docs = [{"_raw": obj}]
-        return docs
+        return _json_docs(_loads(text))
+    if text.lstrip()[:1] in ("{", "["):
+        try:
+            return _json_docs(_loads(text))
+        except ValueError:
+            pass  # flow-style YAML, not JSON
 
     # Try YAML (handles *.yaml, *.yml, and anything else if it parses)
+    import yaml  # deferred: only payload ingestion needs it
     try:
-        loaded = list(yaml.safe_load_all(text))
+        # libyaml's C loader when PyYAML was built with it
+        loaded = list(yaml.load_all(text, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader)))
         # Normalize to list of dicts
         for idx, d in enumerate(loaded):
             if isinstance(d, dict):
@@ -108,44 +243,37 @@ templates.env.filters["fmt_uptime"] = _fmt_uptime
 # -----------------------------------------------------------------------------
 # UI: Home
 # -----------------------------------------------------------------------------
-# top of file
-from agent.detector import detect_outliers_iforest, detect_outliers_iqr  # ensure both are importable
-
-from agent.detector import detect_outliers_iforest, detect_outliers_iqr
-# ... keep the rest of your imports
+def _rule_flags(rs: List[dict]) -> List[dict]:
+    """
+    Rule-based fallback, one vectorized pass: expired license, or <60% of
+    interfaces enabled, or memory >= 85%. Missing/non-numeric values never flag.
+    """
+    lic_bad = np.fromiter((r.get("license_expired") == 1 for r in rs), dtype=bool, count=len(rs))
+    total = to_float_column(r.get("iface_total") for r in rs)
+    ratio = to_float_column(r.get("iface_enabled_ratio") for r in rs)
+    mem = to_float_column(r.get("mem_used_pct") for r in rs)
+    with np.errstate(invalid="ignore"):  # NaN comparisons are simply False
+        mask = lic_bad | ((total > 0) & (ratio < 0.6)) | (mem >= 85.0)
+    return [rs[i] for i in np.flatnonzero(mask)]
 
 @app.get("/", response_class=HTMLResponse)
-def index(request: Request):
-    rows = load_dir(str(UPLOADS))
+async def index(request: Request):
+    rows = await anyio.to_thread.run_sync(load_rows)
 
     anomalies, features, scores = [], [], []
     if rows:
         # 1) Try ML first (more sensitive on small datasets)
         #    You can tune contamination between 0.10–0.30 for small N.
-        anomalies, features, scores = detect_outliers_iforest(
-            rows, contamination=0.20, random_state=42
+        anomalies, features, scores = await anyio.to_thread.run_sync(
+            functools.partial(
+                detect_outliers_iforest, rows, contamination=0.20, random_state=42, n_jobs=IFOREST_N_JOBS
+            )
         )
 
         # 2) If ML finds nothing, fall back to simple, useful rules
         if not anomalies:
             print("Into Manual Mode")
-            def rule_flags(rs):
-                flagged = []
-                for r in rs:
-                    lic_bad = (r.get("license_expired") == 1)
-                    many_disabled = (
-                        (r.get("iface_total", 0) > 0)
-                        and (r.get("iface_enabled_ratio", 1.0) < 0.6)
-                    )
-                    mem_high = (
-                        r.get("mem_used_pct") is not None
-                        and r.get("mem_used_pct") >= 85.0
-                    )
-                    if lic_bad or many_disabled or mem_high:
-                        flagged.append(r)
-                return flagged
-
-            anomalies = rule_flags(rows)
+            anomalies = _rule_flags(rows)
             features = ["license_expired", "iface_enabled_ratio", "mem_used_pct"]
             scores = None
 
@@ -171,6 +299,12 @@ def index(request: Request):
 # -----------------------------------------------------------------------------
 # Upload / Samples
 # -----------------------------------------------------------------------------
+def _save_upload(src, dest: Path) -> None:
+    """Copy the spooled upload to disk in 1 MiB chunks (never the whole file in memory)."""
+    src.seek(0)
+    with open(dest, "wb") as out:
+        shutil.copyfileobj(src, out, 1 << 20)
+
 @app.post("/upload", response_class=RedirectResponse)
 async def upload(files: List[UploadFile] = File(...)):
     """Handle multi-file upload (matches <input name="files" multiple>)."""
@@ -178,16 +312,20 @@ async def upload(files: List[UploadFile] = File(...)):
         if not uf.filename:
             continue
         dest = UPLOADS / uf.filename
-        data = await uf.read()
-        dest.write_bytes(data)
+        await anyio.to_thread.run_sync(_save_upload, uf.file, dest)
+    _download_index.clear()
     return RedirectResponse(url="/", status_code=303)
 
-@app.post("/load-samples", response_class=RedirectResponse)
-def load_samples():
+def _copy_samples() -> None:
     for f in SAMPLES.glob("*.json"):
         target = UPLOADS / f.name
         if not target.exists():
-            target.write_text(f.read_text())
+            shutil.copyfile(f, target)  # sendfile/copy_file_range; no decode/re-encode
+
+@app.post("/load-samples", response_class=RedirectResponse)
+async def load_samples():
+    await anyio.to_thread.run_sync(_copy_samples)
+    _download_index.clear()
     return RedirectResponse(url="/", status_code=303)
 
 # -----------------------------------------------------------------------------
@@ -195,24 +333,15 @@ def load_samples():
 # -----------------------------------------------------------------------------
 @app.post("/ingest", response_class=JSONResponse)
 async def ingest(payload: dict):
-    host = (
-        payload.get("all_gathered_resources", {})
-        .get("device_info", {})
-        .get("device_name")
-        or payload.get("host")
-        or "ingested"
-    )
+    host = _host_of(payload, "ingested")
     dest = UPLOADS / f"{host}_inventory.json"
-    dest.write_text(json.dumps(payload, indent=2))
+    await anyio.to_thread.run_sync(dest.write_bytes, _dumps(payload))
+    _download_index.clear()
     return {"saved": str(dest)}
 
 # -----------------------------------------------------------------------------
 # Scan
 # -----------------------------------------------------------------------------
-from typing import List  # add this at the top
-
-# ...
-
 @app.post("/scan", response_class=HTMLResponse)
 async def scan(
     request: Request,
@@ -221,18 +350,7 @@ async def scan(
     host: str = Form(None),
     hosts: List[str] = Form(None),
 ):
-    all_rows = load_dir(str(UPLOADS))
-
-    anomalies, features, scores = [], [], []
-    if all_rows:
-        if algo == "iforest":
-            from agent.detector import detect_outliers_iforest
-            anomalies, features, scores = detect_outliers_iforest(
-                all_rows, contamination=contamination, random_state=42
-            )
-        else:
-            from agent.detector import detect_outliers_iqr
-            anomalies, features, scores = detect_outliers_iqr(all_rows, k=1.5)
+    all_rows = await anyio.to_thread.run_sync(load_rows)
 
     # Optional focus filtering (keeps current behavior)
     focus = []
@@ -241,10 +359,34 @@ async def scan(
     if hosts:
         focus.extend(hosts)
 
-    pairs = list(zip(anomalies, scores if scores else [None] * len(anomalies)))
-    if focus:
-        focus_set = set(focus)
-        pairs = [p for p in pairs if p[0].get("host") in focus_set]
+    # Detectors still see the whole fleet (a lone host has no baseline to be an
+    # outlier against); focus is applied to the mask, so only focused anomalies
+    # are materialized and annotated.
+    pairs, features = [], []
+    if all_rows:
+        # one columnar extraction shared by whichever detector(s) run
+        frame = FeatureFrame(all_rows)
+        if algo == "iforest":
+            mask, features, scores = await anyio.to_thread.run_sync(
+                functools.partial(
+                    iforest_mask, frame, contamination=contamination, random_state=42,
+                    n_jobs=IFOREST_N_JOBS,
+                )
+            )
+        else:
+            mask, features = await anyio.to_thread.run_sync(functools.partial(iqr_mask, frame, k=1.5))
+            scores = None
+        if focus:
+            focus_set = set(focus)
+            mask = mask & np.fromiter((r.get("host") in focus_set for r in all_rows), dtype=bool, count=len(all_rows))
+        idxs = np.flatnonzero(mask)
+        if scores is None:
+            pairs = [(all_rows[i], None) for i in idxs]
+        else:
+            # one C-level unboxing for the picked scores, not a float() per row
+            pairs = [(all_rows[i], v) for i, v in zip(idxs, scores[idxs].tolist())]
+            for r, v in pairs:
+                r["_iforest_score"] = v  # same annotation detect_outliers_iforest adds
 
     actions = suggest_actions([r for r, _ in pairs]) if pairs else {}
 
@@ -264,18 +406,20 @@ async def scan(
 # -----------------------------------------------------------------------------
 # Execute (simulated)
 # -----------------------------------------------------------------------------
-@app.post("/execute", response_class=HTMLResponse)
-def execute(request: Request):
-    rows = load_dir(str(UPLOADS))
+def _plan_and_execute():
+    rows = load_rows()
 
     if rows:
-        from agent.detector import detect_outliers_iqr
         anomalies, features, scores = detect_outliers_iqr(rows, k=1.5)
     else:
         anomalies = []
 
     actions = suggest_actions(anomalies) if anomalies else {}
-    results = execute_plan(actions)
+    return actions, execute_plan(actions)
+
+@app.post("/execute", response_class=HTMLResponse)
+async def execute(request: Request):
+    actions, results = await anyio.to_thread.run_sync(_plan_and_execute)
 
     return templates.TemplateResponse(
         "plan.html",
@@ -286,44 +430,89 @@ def execute(request: Request):
 # -----------------------------------------------------------------------------
 # Simple report browser
 # -----------------------------------------------------------------------------
-def list_reports():
-    items = []
-    for p in sorted(UPLOADS.glob("*.json")):
-        host = p.stem
-        try:
-            obj = json.loads(p.read_text())
-            agr = obj.get("all_gathered_resources", obj)
-            dev = agr.get("device_info", {})
-            host = dev.get("device_name") or obj.get("host") or p.stem
-        except Exception:
-            obj = None
-        st = p.stat()
+# path -> (mtime_ns, size, host, parsed JSON or _UNPARSED); lets a rescan skip
+# re-reading files that haven't changed since the last one
+_UNPARSED = object()
+_report_files: dict = {}
+
+def _parse_report(path: str, stem: str):
+    """(host, parsed JSON) for one report file; (stem, _UNPARSED) if it can't be parsed."""
+    try:
+        with open(path, "rb") as f:
+            obj = _loads(f.read())
+    except Exception:
+        return stem, _UNPARSED
+    try:
+        return _host_of(obj, stem, flat=True), obj
+    except Exception:
+        return stem, obj
+
+def _scan_reports(root: str):
+    """
+    Report listing for root, host -> item (first file wins) and filename -> item
+    indexes, and the parsed JSON per filename, so lookups never parse a file again.
+    One scandir pass; DirEntry.stat() supplies size/mtime.
+    """
+    global _report_files
+    try:
+        with os.scandir(root) as it:
+            entries = [e for e in it if e.name.endswith(".json") and not e.name.startswith(".") and e.is_file()]
+    except FileNotFoundError:  # created at startup; absent if the app was imported without it
+        entries = []
+    entries.sort(key=lambda e: e.name)
+
+    items, parsed, seen = [], {}, {}
+    for e in entries:
+        st = e.stat()
+        prev = _report_files.get(e.path)
+        if prev is not None and prev[:2] == (st.st_mtime_ns, st.st_size):
+            host, obj = prev[2], prev[3]
+        else:
+            host, obj = _parse_report(e.path, e.name[:-len(".json")])
+        seen[e.path] = (st.st_mtime_ns, st.st_size, host, obj)
+        if obj is not _UNPARSED:
+            parsed[e.name] = obj
         items.append(
             {
                 "host": host,
-                "filename": p.name,
-                "path": str(p),
+                "filename": e.name,
+                "path": e.path,
                 "size": st.st_size,
                 "mtime": st.st_mtime,
                 "mtime_human": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(st.st_mtime)),
             }
         )
-    return items
+    _report_files = seen
+    by_host: dict = {}
+    for it in items:
+        by_host.setdefault(it["host"], it)
+    return items, by_host, {it["filename"]: it for it in items}, parsed
+
+def list_reports():
+    return [dict(it) for it in _cached_load(_scan_reports, UPLOADS)[0]]
 
 def get_report_by_host(host: str):
-    for it in list_reports():
-        if it["host"] == host:
-            p = UPLOADS / it["filename"]
-            try:
-                obj = json.loads(p.read_text())
-            except Exception:
-                obj = {"_error": f"Could not parse JSON in {it['filename']}"}
-            return it, obj
-    return None, None
+    _, by_host, _, parsed = _cached_load(_scan_reports, UPLOADS)
+    it = by_host.get(host)
+    if it is None:
+        return None, None
+    if it["filename"] in parsed:
+        obj = parsed[it["filename"]]
+    else:
+        obj = {"_error": f"Could not parse JSON in {it['filename']}"}
+    return dict(it), obj
+
+def get_report_by_filename(filename: str):
+    """(host, parsed JSON) from the cached scan, or (None, None) if it isn't a parsed upload."""
+    _, _, by_file, parsed = _cached_load(_scan_reports, UPLOADS)
+    it = by_file.get(filename)
+    if it is None or filename not in parsed:
+        return None, None
+    return it["host"], parsed[filename]
 
 @app.get("/reports", response_class=HTMLResponse)
 async def reports(request: Request):
-    items = list_reports()
+    items = await anyio.to_thread.run_sync(list_reports)
     return templates.TemplateResponse("reports.html", {"request": request, "items": items})
 
 # @app.get("/report", response_class=HTMLResponse)
@@ -366,6 +555,19 @@ async def reports(request: Request):
 #     pretty = json.dumps(obj, indent=2, sort_keys=True)
 #     return templates.TemplateResponse("report.html", {"request": request, "meta": meta, "pretty": pretty})
 
+# /report pages whose JSON dump is larger than this are streamed
+_STREAM_PRETTY_CHARS = 256 << 10
+
+def _pretty_markup(obj) -> Markup:
+    """Sorted, indented JSON, HTML-escaped once here so the template emits it as-is."""
+    return escape(_dumps(obj, sort_keys=True).decode("utf-8"))
+
+async def _row_for_host(host):
+    try:
+        return await anyio.to_thread.run_sync(row_for_host, host)
+    except Exception:
+        return None
+
 # app.py  — replace your /report handler with this version
 @app.get("/report", response_class=HTMLResponse)
 async def report(request: Request, host: str | None = None, filename: str | None = None):
@@ -373,74 +575,87 @@ async def report(request: Request, host: str | None = None, filename: str | None
 
     # We'll also pass the merged 'row' (from loader) so health badges can be shown.
     row_agg = None
-    try:
-        all_rows = load_dir(str(UPLOADS))
-    except Exception:
-        all_rows = []
 
     if host:
-        meta, obj = get_report_by_host(host)
+        meta, obj = await anyio.to_thread.run_sync(get_report_by_host, host)
         if not obj:
             return templates.TemplateResponse(
                 "report.html",
                 {"request": request, "error": f"No report found for host '{host}'"}
             )
         # Find merged row for this host (contains health fields)
-        row_agg = next((r for r in all_rows if r.get("host") == host), None)
+        row_agg = await _row_for_host(host)
 
     elif filename:
-        p = UPLOADS / filename
-        if not p.exists():
-            return templates.TemplateResponse(
-                "report.html",
-                {"request": request, "error": f"File not found: {filename}"}
-            )
-        try:
-            obj = json.loads(p.read_text())
-        except Exception as e:
-            obj = {"_error": f"Could not parse JSON: {e}"}
-        meta = {
-            "host": (obj.get("all_gathered_resources", obj).get("device_info", {}).get("device_name")
-                     or obj.get("host") or Path(filename).stem),
-            "filename": filename,
-        }
+        name, obj = await anyio.to_thread.run_sync(get_report_by_filename, filename)
+        if name is None:
+            p = UPLOADS / filename
+            if not p.exists():
+                return templates.TemplateResponse(
+                    "report.html",
+                    {"request": request, "error": f"File not found: {filename}"}
+                )
+            try:
+                obj = _loads(await anyio.to_thread.run_sync(p.read_bytes))
+            except Exception as e:
+                obj = {"_error": f"Could not parse JSON: {e}"}
+            name = _host_of(obj, Path(filename).stem, flat=True)
+        meta = {"host": name, "filename": filename}
         # Best-effort match by host
-        row_agg = next((r for r in all_rows if r.get("host") == meta["host"]), None)
+        row_agg = await _row_for_host(meta["host"])
     else:
         return templates.TemplateResponse(
             "report.html",
             {"request": request, "error": "Provide ?host=... or ?filename=..."}
         )
 
-    pretty = json.dumps(obj, indent=2, sort_keys=True)
-    return templates.TemplateResponse(
-        "report.html",
-        {"request": request, "meta": meta, "pretty": pretty, "row": row_agg}
-    )
+    pretty = await anyio.to_thread.run_sync(_pretty_markup, obj)
+    ctx = {"request": request, "meta": meta, "pretty": pretty, "row": row_agg}
+    if len(pretty) > _STREAM_PRETTY_CHARS:
+        # send the page as the template renders it instead of building one big string
+        return StreamingResponse(templates.get_template("report.html").generate(ctx), media_type="text/html")
+    return templates.TemplateResponse("report.html", ctx)
 
 
 # -----------------------------------------------------------------------------
 # Download with strict path safety
 # -----------------------------------------------------------------------------
+# name -> resolved path; filled lazily, cleared whenever the app writes uploads
+_download_index: dict[str, Path] = {}
+
 def _resolve_download(name: str) -> Path:
     safe = Path(name).name  # prevent traversal
+    p = _download_index.get(safe)
+    if p is not None:
+        return p
     for root in (UPLOADS, SAMPLES):
-        cand = (root / safe).resolve()
-        if cand.is_file() and str(cand).startswith(str(root)):
+        cand = root / safe
+        if not cand.is_file():  # one stat; misses skip the realpath below
+            continue
+        cand = cand.resolve()
+        if cand.is_relative_to(root):  # a symlink must not lead outside (or to a sibling like uploads2/)
+            _download_index[safe] = cand
             return cand
     raise HTTPException(status_code=404, detail=f"File not found: {safe}")
 
 @app.get("/download/{name}")
 async def download(name: str):
     p = _resolve_download(name)
-    return FileResponse(path=p, media_type="application/json", filename=p.name)
+    try:
+        st = os.stat(p)
+    except FileNotFoundError:  # removed since it was resolved
+        _download_index.pop(p.name, None)
+        p = _resolve_download(name)
+        st = os.stat(p)
+    # stat_result lets FileResponse set Content-Length/ETag without stat'ing again
+    return FileResponse(path=p, media_type="application/json", filename=p.name, stat_result=st)
 
 
 @app.get("/health", response_class=HTMLResponse)
-def health(request: Request, host: str):
+async def health(request: Request, host: str):
     # read all to ensure we can show inventory + pull the health map
-    rows = load_dir(str(UPLOADS))
-    health_map = load_healthchecks(str(UPLOADS))
+    rows = await anyio.to_thread.run_sync(load_rows)
+    health_map = await anyio.to_thread.run_sync(load_health)
     h = health_map.get(host)
     if not h:
         raise HTTPException(status_code=404, detail=f"No healthchecks found for host '{host}'")
@@ -448,4 +663,19 @@ def health(request: Request, host: str):
         "request": request,
         "host": host,
         "health": h,
-    })
\ No newline at end of file
+    })
+
+
+if __name__ == "__main__":
+    # `python app.py`: uvicorn's "auto" loop/http pick uvloop + httptools when they are
+    # installed (pip install uvloop httptools, or uvicorn[standard]) and fall back to
+    # asyncio + h11 otherwise. APP_WORKERS > 1 runs one process per worker.
+    import uvicorn
+    uvicorn.run(
+        "app:app",
+        host=os.environ.get("APP_HOST", "127.0.0.1"),
+        port=int(os.environ.get("APP_PORT", "8000")),
+        loop="auto",
+        http="auto",
+        workers=int(os.environ.get("APP_WORKERS", "1")),
+    )
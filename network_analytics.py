@@ -18,30 +18,45 @@ from __future__ import annotations
 
 import os
 import io
+import asyncio
+import codecs
+import csv
 import re
 import sys
 import json
-import glob
+import fnmatch
 import time
 import yaml
 import uuid
 import shutil
 import signal
-import pandas as pd  # optional, used for CSV export (ok if installed)
+import httpx
 import requests
 import subprocess
 
 from datetime import datetime
+from importlib.util import find_spec
 from pathlib import Path
 from typing import Optional, List, Dict, Any, Tuple
 from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter, Retry
+
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None
+
+try:
+    import ijson
+except Exception:  # pragma: no cover
+    ijson = None
 
 from mcp.server.fastmcp import FastMCP
 from mcp.server.stdio import stdio_server
 
 # ---- your helpers
 from anomaly import isolation_forest_detect
-from ansible_runner import run_playbook as run_playbook_local
+from ansible_runner import run_playbook_async as run_playbook_local
 
 APP_NAME = "aap-network-analytics"
 
@@ -52,59 +67,124 @@ Path(OUT_DIR).mkdir(parents=True, exist_ok=True)
 Path(UI_DIR_DEFAULT).mkdir(parents=True, exist_ok=True)
 
 mcp = FastMCP(APP_NAME)
+# libyaml's C loader when PyYAML was built with it
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 ts = lambda: datetime.utcnow().strftime("%Y%m%d-%H%M%S")
 
 # ---------------------------------------------------------------------------
 # UTF-8 & response safety helpers
 # ---------------------------------------------------------------------------
 
-def _ascii_safe(obj):
-    """
-    Recursively convert strings to ASCII-safe (backslash-escaped).
-    Prevents transport layers that assume latin-1 from crashing on unicode.
-    """
+def _json_backslashreplace(err: UnicodeEncodeError):
+    # backslashreplace, with the backslash itself JSON-escaped so it survives json.loads
+    return err.object[err.start:err.end].encode("ascii", "backslashreplace").decode("ascii").replace("\\", "\\\\"), err.end
+
+codecs.register_error("json_backslashreplace", _json_backslashreplace)
+
+def _ascii_safe_walk(obj):
     if isinstance(obj, str):
         return obj.encode("ascii", "backslashreplace").decode("ascii")
     if isinstance(obj, dict):
-        return { _ascii_safe(k): _ascii_safe(v) for k, v in obj.items() }
+        return { _ascii_safe_walk(k): _ascii_safe_walk(v) for k, v in obj.items() }
     if isinstance(obj, list):
-        return [ _ascii_safe(x) for x in obj ]
+        return [ _ascii_safe_walk(x) for x in obj ]
     return obj
 
+def _ascii_safe(obj):
+    """
+    Convert strings to ASCII-safe (backslash-escaped), anywhere in the payload.
+    Prevents transport layers that assume latin-1 from crashing on unicode.
+    One C-level json.dumps walks the tree; all-ASCII payloads (the common case)
+    are returned as-is, otherwise the escaping is applied to the dumped text in
+    one codec pass and loaded back. Payloads json can't dump use the Python walk.
+    """
+    try:
+        text = json.dumps(obj, ensure_ascii=False)
+    except (TypeError, ValueError):
+        return _ascii_safe_walk(obj)
+    if text.isascii():
+        return obj
+    return json.loads(text.encode("ascii", "json_backslashreplace"))
+
+def _orjson_chunks(data: Any):
+    """
+    orjson output for data in pieces: a top-level list (e.g. merged PR docs) is
+    encoded one element at a time, so only one element's bytes exist at once.
+    Re-indenting each piece is a plain newline replace, since encoded strings
+    never contain raw newlines.
+    """
+    opt = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+    if not (isinstance(data, list) and data):
+        yield orjson.dumps(data, option=opt)
+        return
+    yield b"[\n  "
+    for i, item in enumerate(data):
+        if i:
+            yield b",\n  "
+        yield orjson.dumps(item, option=opt).replace(b"\n", b"\n  ")
+    yield b"\n]"
+
 def _write_json(path: str, data: Any):
+    """Pretty UTF-8 JSON, written as it is encoded; orjson when available, stdlib for anything it can't serialize (e.g. huge ints)."""
     os.makedirs(os.path.dirname(path), exist_ok=True)
+    if orjson is not None:
+        try:
+            with open(path, "wb") as f:
+                for chunk in _orjson_chunks(data):
+                    f.write(chunk)
+            return
+        except TypeError:
+            pass  # rewritten below
+    # json.dump streams iterencode() chunks to the file rather than building one string
     with open(path, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=2, ensure_ascii=False)
 
+def _write_csv(path: str, rows: List[dict]) -> None:
+    """
+    Sparse rows -> CSV, streamed with csv.DictWriter (no DataFrame).
+    Columns are the union of keys in first-seen order; missing cells are empty.
+    """
+    header = list(dict.fromkeys(k for r in rows for k in r))
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=header, lineterminator="\n")
+        w.writeheader()
+        w.writerows(rows)
+
 # ---------------------------------------------------------------------------
 # AAP (Controller) REST helpers
 # ---------------------------------------------------------------------------
 
-import urllib.request, urllib.error
-
 AAP_URL = os.environ.get("AAP_URL")     # e.g. https://aap.example.com/api/controller/v2
 AAP_TOKEN = os.environ.get("AAP_TOKEN")
 
+# Keep-alive session for Controller calls: job polls reuse one TLS connection.
+# No retries here -- a retried POST .../launch/ could start the job twice.
+_aap_session = requests.Session()
+_aap_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+_aap_session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
 def _http(method: str, url: str, data: Optional[dict] = None, timeout: int = 60) -> dict:
-    req = urllib.request.Request(url, method=method)
+    headers = {"Content-Type": "application/json"}
     if AAP_TOKEN:
-        req.add_header("Authorization", f"Bearer {AAP_TOKEN}")
-    req.add_header("Content-Type", "application/json")
+        headers["Authorization"] = f"Bearer {AAP_TOKEN}"
     body = None
     if data is not None:
         body = json.dumps(data).encode("utf-8")
     try:
-        with urllib.request.urlopen(req, data=body, timeout=timeout) as r:
-            ctype = r.headers.get_content_type()
-            raw = r.read()
-            if ctype == "application/json":
-                return json.loads(raw.decode("utf-8", errors="replace"))
-            return {"status": r.status, "text": raw.decode("utf-8", errors="replace")}
-    except urllib.error.HTTPError as e:
-        return {"status": e.code, "error": e.read().decode("utf-8", errors="replace")}
+        r = _aap_session.request(method, url, data=body, headers=headers, timeout=timeout)
+        raw = r.content
+        if r.status_code >= 400:
+            return {"status": r.status_code, "error": raw.decode("utf-8", errors="replace")}
+        ctype = r.headers.get("Content-Type", "").split(";", 1)[0].strip().lower()
+        if ctype == "application/json":
+            return json.loads(raw.decode("utf-8", errors="replace"))
+        return {"status": r.status_code, "text": raw.decode("utf-8", errors="replace")}
     except Exception as e:
         return {"status": "error", "error": str(e)}
 
+JOB_POLL_MIN = 0.25  # seconds; first poll interval, grows 1.5x per poll
+JOB_POLL_MAX = 10.0
+
 def _controller_available() -> bool:
     return bool(AAP_URL and AAP_TOKEN)
 
@@ -117,13 +197,15 @@ def run_job_template(template_id: int, extra_vars: Optional[dict] = None) -> dic
     if "job" not in res:
         return {"ok": False, "error": res}
     job_id = res["job"]
-    # poll
+    # poll: short jobs are noticed within ~0.25s, long ones are asked at most every 10s
+    delay = JOB_POLL_MIN
     while True:
         j = _http("GET", f"{AAP_URL}/jobs/{job_id}/")
         status = j.get("status")
         if status in {"successful", "failed", "error", "canceled"}:
             break
-        time.sleep(2)
+        time.sleep(delay)
+        delay = min(delay * 1.5, JOB_POLL_MAX)
     # fetch stdout (optional)
     stdout_resp = _http("GET", f"{AAP_URL}/jobs/{job_id}/stdout/?format=txt")
     stdout = stdout_resp.get("text") if isinstance(stdout_resp, dict) else None
@@ -143,24 +225,85 @@ def _gh_headers() -> dict:
         h["Authorization"] = f"Bearer {token}"
     return h
 
-def _fetch_text(url: str, timeout: int = 30) -> str:
-    r = requests.get(url, headers=_gh_headers(), timeout=timeout)
-    r.encoding = "utf-8"  # force UTF-8
-    r.raise_for_status()
-    return r.text
+# GITHUB_TOKEN is read once per process
+_GH_HEADERS = _gh_headers()
+
+# One pooled session for the api.github.com calls: keep-alive and TLS reuse across calls
+_gh_session = requests.Session()
+_gh_adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    max_retries=Retry(
+        total=3,
+        connect=3,
+        read=3,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",),
+        raise_on_status=False,
+    ),
+)
+_gh_session.mount("https://", _gh_adapter)
+_gh_session.mount("http://", _gh_adapter)
+_gh_session.headers.update(_GH_HEADERS)
+
+# PR file bodies are fetched together on one async client; HTTP/2 (when h2 is
+# installed) multiplexes them over a single connection to raw.githubusercontent.com
+GH_ASYNC_MAX_CONNECTIONS = 64
+GH_FETCH_RETRIES = 3
+_GH_HTTP2 = find_spec("h2") is not None
+
+async def _fetch_all_bytes(urls: List[str], timeout: int = 30) -> List[bytes]:
+    """
+    GET every URL concurrently and return the bodies in input order. 429/5xx
+    and transport errors are retried with backoff, like _gh_session's Retry.
+    """
+    limits = httpx.Limits(max_connections=GH_ASYNC_MAX_CONNECTIONS)
+    async with httpx.AsyncClient(http2=_GH_HTTP2, headers=_GH_HEADERS, limits=limits,
+                                 timeout=timeout, follow_redirects=True) as client:
+        async def get(url: str) -> bytes:
+            for attempt in range(GH_FETCH_RETRIES + 1):
+                last = attempt == GH_FETCH_RETRIES
+                try:
+                    r = await client.get(url)
+                except httpx.TransportError:
+                    if last:
+                        raise
+                else:
+                    if r.status_code not in (429, 500, 502, 503, 504) or last:
+                        r.raise_for_status()
+                        return r.content
+                await asyncio.sleep(0.5 * 2 ** attempt)
+        return await asyncio.gather(*(get(u) for u in urls))
 
 def _gh_get_json(url: str, timeout: int = 30) -> dict:
-    r = requests.get(url, headers=_gh_headers(), timeout=timeout)
+    r = _gh_session.get(url, timeout=timeout)
     r.encoding = "utf-8"
     r.raise_for_status()
     return r.json()
 
+def _gh_iter_json_items(url: str, timeout: int = 30):
+    """
+    Yield the elements of a JSON array response one at a time. With ijson the
+    body is parsed off the socket, so only the current element is held in
+    memory; without it this falls back to _gh_get_json.
+    """
+    if ijson is None:
+        yield from _gh_get_json(url, timeout=timeout)
+        return
+    with _gh_session.get(url, timeout=timeout, stream=True) as r:
+        r.raise_for_status()
+        r.raw.decode_content = True  # undo gzip transfer encoding before parsing
+        yield from ijson.items(r.raw, "item", use_float=True)
+
+_PR_URL_RE = re.compile(r"https?://github\.com/([^/]+)/([^/]+)/pull/(\d+)")
+
 def _parse_pr_url(pr_url: str) -> Tuple[str, str, int]:
     """
     Return (owner, repo, pr_number)
     e.g., https://github.com/owner/repo/pull/123
     """
-    m = re.match(r"https?://github\.com/([^/]+)/([^/]+)/pull/(\d+)", pr_url)
+    m = _PR_URL_RE.match(pr_url)
     if not m:
         raise ValueError(f"Unrecognized PR URL: {pr_url}")
     return m.group(1), m.group(2), int(m.group(3))
@@ -173,18 +316,19 @@ def _flatten(obj, prefix=""):
     """
     Flatten nested dict/list for CSV-friendly rows.
     dict -> dotted.keys, list -> dotted[0], dotted[1], ...
+    Walks an explicit stack (children pushed in reverse, so leaves come out in
+    document order) and writes leaves straight into one dict.
     """
     flat = {}
-    if isinstance(obj, dict):
-        for k, v in obj.items():
-            p = f"{prefix}.{k}" if prefix else k
-            flat.update(_flatten(v, p))
-    elif isinstance(obj, list):
-        for i, v in enumerate(obj):
-            p = f"{prefix}[{i}]"
-            flat.update(_flatten(v, p))
-    else:
-        flat[prefix or "_"] = obj
+    stack = [(obj, prefix)]
+    while stack:
+        o, p = stack.pop()
+        if isinstance(o, dict):
+            stack.extend(reversed([(v, f"{p}.{k}" if p else k) for k, v in o.items()]))
+        elif isinstance(o, list):
+            stack.extend(reversed([(v, f"{p}[{i}]") for i, v in enumerate(o)]))
+        else:
+            flat[p or "_"] = o
     return flat
 
 # ---------------------------------------------------------------------------
@@ -211,7 +355,7 @@ def _save_host_json(data: dict, hint_name: str, out_dir: str) -> str:
 # ---------------------------------------------------------------------------
 
 @mcp.tool()
-def run_reports_local(
+async def run_reports_local(
     playbook_path: str,
     inventory: str,
     out_file: str = "outputs/report.json",
@@ -230,7 +374,7 @@ def run_reports_local(
             extra_vars = {}
         extra_vars.setdefault("out_file", out_file_abs)
 
-        res = run_playbook_local(playbook_path, inventory, extra_vars, OUT_DIR, timeout)
+        res = await run_playbook_local(playbook_path, inventory, extra_vars, OUT_DIR, timeout)
         res["out_file"] = out_file_abs
         return _ascii_safe(res)
     except Exception as e:
@@ -282,7 +426,7 @@ def detect_anomalies(
         return _ascii_safe({"ok": False, "error": str(e)})
 
 @mcp.tool()
-def run_pipeline_local(
+async def run_pipeline_local(
     playbook_path: str,
     inventory: str,
     out_file: str = "outputs/pipeline.json",
@@ -293,7 +437,7 @@ def run_pipeline_local(
     Convenience: run a local playbook -> detect anomalies on its output.
     """
     try:
-        r = run_reports_local(playbook_path, inventory, out_file=out_file)
+        r = await run_reports_local(playbook_path, inventory, out_file=out_file)
         if r.get("rc", 1) != 0:
             return _ascii_safe({"ok": False, "step": "reports", "detail": r})
         anoms = detect_anomalies(r["out_file"], id_field=id_field, contamination=contamination)
@@ -311,10 +455,13 @@ def export_to_ui(ui_dir: Optional[str] = None) -> dict:
         ui_dir = os.path.abspath(ui_dir)
         os.makedirs(ui_dir, exist_ok=True)
         copied = []
-        for fp in glob.glob(os.path.join(OUT_DIR, "*")):
-            if fp.endswith((".json", ".csv")):
-                shutil.copy2(fp, os.path.join(ui_dir, os.path.basename(fp)))
-                copied.append(os.path.basename(fp))
+        # names come with the directory listing; copyfile skips copy2's metadata syscalls
+        with os.scandir(OUT_DIR) as it:
+            for entry in it:
+                name = entry.name
+                if name.endswith((".json", ".csv")) and not name.startswith(".") and entry.is_file():
+                    shutil.copyfile(entry.path, os.path.join(ui_dir, name))
+                    copied.append(name)
         return _ascii_safe({"ok": True, "ui_dir": ui_dir, "copied": copied})
     except Exception as e:
         return _ascii_safe({"ok": False, "error": str(e)})
@@ -332,27 +479,63 @@ def _pid_alive(pid: int) -> bool:
     except Exception:
         return False
 
+def _read_pid() -> Optional[int]:
+    try:
+        return int(Path(UI_PID_FILE).read_text(encoding="utf-8").strip())
+    except Exception:
+        return None
+
+# ((mtime_ns, size) of UI_PID_FILE, pid or None, alive, monotonic time of the probe)
+_ui_pid_cache: Optional[tuple] = None
+UI_ALIVE_TTL = 0.2  # seconds a liveness probe is reused by ui_status
+
+def _ui_pid(max_age: float = 0.0) -> Tuple[Optional[int], bool]:
+    """
+    (pid, alive) from UI_PID_FILE; (None, False) if it is missing or unparsable.
+    The file is re-read only when its (mtime, size) changes, and the kill(pid, 0)
+    probe is reused while younger than max_age.
+    """
+    global _ui_pid_cache
+    try:
+        st = os.stat(UI_PID_FILE)
+    except OSError:
+        _ui_pid_cache = None
+        return None, False
+    key, now, c = (st.st_mtime_ns, st.st_size), time.monotonic(), _ui_pid_cache
+    if c is not None and c[0] == key:
+        if now - c[3] < max_age:
+            return c[1], c[2]
+        pid = c[1]
+    else:
+        pid = _read_pid()
+    alive = pid is not None and _pid_alive(pid)
+    _ui_pid_cache = (key, pid, alive, now)
+    return pid, alive
+
 @mcp.tool()
-def start_ui(app_path: str, port: int = 8000, host: str = "127.0.0.1", reload: bool = False) -> dict:
+def start_ui(app_path: str, port: int = 8000, host: str = "127.0.0.1", reload: bool = False,
+             workers: int = 1) -> dict:
     try:
         app_path = os.path.abspath(app_path)
         if not os.path.exists(app_path):
             return _ascii_safe({"ok": False, "error": f"app not found: {app_path}"})
-        if os.path.exists(UI_PID_FILE):
-            try:
-                pid = int(open(UI_PID_FILE, "r", encoding="utf-8").read().strip())
-                if _pid_alive(pid):
-                    return _ascii_safe({"ok": True, "status": "already running", "pid": pid,
-                                        "url": f"http://{host}:{port}", "log": LOG_FILE})
-            except Exception:
-                pass
+        pid, alive = _ui_pid()  # always a fresh probe before deciding to spawn
+        if alive:
+            return _ascii_safe({"ok": True, "status": "already running", "pid": pid,
+                                "url": f"http://{host}:{port}", "log": LOG_FILE})
         workdir = os.path.dirname(app_path)
         cmd = [sys.executable, "-m", "uvicorn", "app:app", "--host", host, "--port", str(port)]
+        # uvicorn already uses uvloop + httptools when installed (--loop/--http auto)
         if reload:
             cmd.append("--reload")
+        elif workers > 1:  # uvicorn ignores --workers under --reload
+            cmd += ["--workers", str(workers)]
         os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
-        logf = open(LOG_FILE, "ab")
-        proc = subprocess.Popen(cmd, cwd=workdir, stdout=logf, stderr=subprocess.STDOUT, start_new_session=True)
+        # No preexec_fn/uid/gid/umask: on Linux, CPython 3.10+ then spawns via vfork, so the
+        # child never copies this process's page tables. The child keeps its own log fd.
+        with open(LOG_FILE, "ab") as logf:
+            proc = subprocess.Popen(cmd, cwd=workdir, stdout=logf, stderr=subprocess.STDOUT,
+                                    start_new_session=True)
         with open(UI_PID_FILE, "w", encoding="utf-8") as f:
             f.write(str(proc.pid))
         return _ascii_safe({"ok": True, "status": "started", "pid": proc.pid,
@@ -365,8 +548,8 @@ def stop_ui() -> dict:
     try:
         if not os.path.exists(UI_PID_FILE):
             return _ascii_safe({"ok": True, "status": "not running"})
+        pid, _ = _ui_pid(UI_ALIVE_TTL)
         try:
-            pid = int(open(UI_PID_FILE, "r", encoding="utf-8").read().strip())
             os.kill(pid, signal.SIGTERM)
         except Exception:
             pass
@@ -381,13 +564,8 @@ def stop_ui() -> dict:
 @mcp.tool()
 def ui_status() -> dict:
     try:
-        if os.path.exists(UI_PID_FILE):
-            try:
-                pid = int(open(UI_PID_FILE, "r", encoding="utf-8").read().strip())
-                return _ascii_safe({"running": _pid_alive(pid), "pid": pid, "log": LOG_FILE})
-            except Exception:
-                return _ascii_safe({"running": False, "pid": None, "log": LOG_FILE})
-        return _ascii_safe({"running": False, "pid": None, "log": LOG_FILE})
+        pid, alive = _ui_pid(UI_ALIVE_TTL)
+        return _ascii_safe({"running": alive, "pid": pid, "log": LOG_FILE})
     except Exception as e:
         return _ascii_safe({"ok": False, "error": str(e)})
 
@@ -396,13 +574,14 @@ def ui_status() -> dict:
 # ---------------------------------------------------------------------------
 
 @mcp.tool()
-def ingest_github_pr(
+async def ingest_github_pr(
     pr_url: str,
     include_glob: str = "host_vars/*.yaml",
     export_to_ui_bool: bool = True,
     start_ui_after: bool = False,
     ui_app_path: Optional[str] = None,
-    ui_port: int = 8000
+    ui_port: int = 8000,
+    emit_csv: bool = True
 ) -> dict:
     """
     Read files from a GitHub PR, normalize, and export artifacts for the UI.
@@ -413,6 +592,7 @@ def ingest_github_pr(
     - start_ui_after: optionally start the local UI with uvicorn
     - ui_app_path: path to your FastAPI app.py (only used if start_ui_after=True)
     - ui_port: port to run the UI on
+    - emit_csv: also write the flattened rows as CSV (False skips it; "csv" is then null)
     """
     try:
         owner, repo, pr_num = _parse_pr_url(pr_url)
@@ -426,31 +606,36 @@ def ingest_github_pr(
 
         # list PR files
         files_api = f"https://api.github.com/repos/{owner}/{repo}/pulls/{pr_num}/files"
-        pr_files = _gh_get_json(files_api)
+        pr_files = _gh_iter_json_items(files_api)
 
         matched = []
         rows = []
         raw_docs = []
         per_host_files = []
 
+        include_re = re.compile(fnmatch.translate(include_glob))
+        paths = []
         for f in pr_files:
             path = f.get("filename")
             status = f.get("status")
             if status not in {"added", "modified", "renamed"}:
                 continue
-            if not re.match(fnmatch_translate(include_glob), path):
+            if not include_re.match(path):
                 continue
+            paths.append(path)
 
-            raw_url = _raw_url(owner, repo, head_sha, path)
-            raw_text = _fetch_text(raw_url)
+        # fetch concurrently; parse/save below stays in PR order
+        bodies = await _fetch_all_bytes([_raw_url(owner, repo, head_sha, p) for p in paths])
+        fetched = list(zip(paths, bodies))
 
-            # parse
+        for path, raw in fetched:
+            # parse straight from the response bytes (both parsers take UTF-8 bytes)
             if path.endswith((".yaml", ".yml")):
-                data = yaml.safe_load(raw_text) or {}
+                data = yaml.load(raw, Loader=_YAML_LOADER) or {}
             elif path.endswith(".json"):
-                data = json.loads(raw_text)
+                data = json.loads(raw)
             else:
-                data = {"_raw": raw_text}
+                data = {"_raw": raw.decode("utf-8", "replace")}
 
             raw_docs.append({"file": path, "data": data})
             rows.append({"file": path, **_flatten(data)})
@@ -476,12 +661,12 @@ def ingest_github_pr(
         _write_json(flat_json, rows)
 
         csv_path = None
-        try:
-            df = pd.DataFrame(rows)
-            csv_path = os.path.join(OUT_DIR, f"{base_name}.csv")
-            df.to_csv(csv_path, index=False)
-        except Exception:
-            csv_path = None
+        if emit_csv:
+            try:
+                csv_path = os.path.join(OUT_DIR, f"{base_name}.csv")
+                _write_csv(csv_path, rows)
+            except Exception:
+                csv_path = None
 
         exported = []
         if export_to_ui_bool:
@@ -504,11 +689,6 @@ def ingest_github_pr(
     except Exception as e:
         return _ascii_safe({"ok": False, "error": str(e)})
 
-def fnmatch_translate(pat: str) -> str:
-    """Translate a shell PATTERN to a regular expression (like fnmatch.translate but local)."""
-    import fnmatch as _fn
-    return _fn.translate(pat)
-
 # ---------------------------------------------------------------------------
 # Ingest: raw URL(s)
 # ---------------------------------------------------------------------------
@@ -518,7 +698,7 @@ def _parse_payload(text: str) -> List[dict]:
     Try YAML first, then JSON; return a list of documents.
     """
     try:
-        doc = yaml.safe_load(text)
+        doc = yaml.load(text, Loader=_YAML_LOADER)
         if doc is None:
             return []
         if isinstance(doc, list):
@@ -541,11 +721,14 @@ import unicodedata
 
 # ---------- helpers (drop these near the top with your other helpers) ----------
 
+_NONFN_RE = re.compile(r"[^\w.\-+]+")
+_CTRL_TRANS = dict.fromkeys(range(32))  # str.translate table deleting C0 control chars
+
 def _safe_filename(name: str) -> str:
     # normalize to ascii-ish and strip bad chars
     norm = unicodedata.normalize("NFKD", name)
-    norm = "".join(c for c in norm if ord(c) >= 32)  # drop control chars
-    norm = re.sub(r"[^\w.\-+]+", "_", norm)          # keep letters, digits, _ . - +
+    norm = norm.translate(_CTRL_TRANS)               # drop control chars
+    norm = _NONFN_RE.sub("_", norm)                  # keep letters, digits, _ . - +
     return norm.strip("._") or "file"
 
 def _http_get_text(url: str, timeout: int = 30) -> str:
@@ -581,7 +764,7 @@ def _parse_payload_text(text: str, url_hint: str | None = None) -> list[dict]:
     lower = (url_hint or "").lower()
 
     def _parse_yaml(t: str):
-        docs = [d for d in yaml.safe_load_all(t) if d is not None]
+        docs = [d for d in yaml.load_all(t, Loader=_YAML_LOADER) if d is not None]
         # if single dict -> [dict]; if list-of-dicts -> flatten; else wrap
         if len(docs) == 1:
             d = docs[0]
@@ -635,16 +818,9 @@ def _save_host_json(data: dict, hint_name: str, out_dir: str) -> str:
     # Ensure UTF-8 write and a safe filename
     safe = _safe_filename(_guess_host_name(data, hint_name)) + "_inventory.json"
     path = os.path.join(out_dir, safe)
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    _write_json(path, data)
     return path
 
-def _write_json(path: str, obj) -> None:
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(obj, f, indent=2, ensure_ascii=False)
-
 # ---------- improved tool ----------
 
 @mcp.tool()
@@ -709,66 +885,10 @@ def ingest_raw_url(
         return {"ok": False, "error": str(e)}
 
 
-# @mcp.tool()
-# def ingest_raw_urls(
-#     urls: List[str],
-#     export_to_ui_bool: bool = True,
-#     start_ui_after: bool = False,
-#     ui_app_path: Optional[str] = None,
-#     ui_port: int = 8000
-# ) -> dict:
-#     """
-#     Fetch one or more raw URLs (YAML/JSON), produce per-host JSON files in OUT_DIR,
-#     then optionally export to UI and start the UI.
-#     """
-#     try:
-#         if not urls:
-#             return _ascii_safe({"ok": False, "error": "No URLs provided"})
-
-#         saved_files = []
-#         errors = []
-
-#         for url in urls:
-#             try:
-#                 text = _fetch_text(url)
-#                 docs = _parse_payload(text)
-#                 if not docs:
-#                     errors.append({"url": url, "error": "No parsable documents"})
-#                     continue
-
-#                 filename_hint = Path(urlparse(url).path).name or f"ingested_{ts()}"
-#                 if len(docs) == 1:
-#                     saved_files.append(_save_host_json(docs[0], filename_hint, OUT_DIR))
-#                 else:
-#                     for idx, d in enumerate(docs):
-#                         saved_files.append(_save_host_json(d, f"{Path(filename_hint).stem}_{idx}", OUT_DIR))
-
-#             except Exception as e:
-#                 errors.append({"url": url, "error": str(e)})
-
-#         exported = []
-#         if export_to_ui_bool:
-#             exported = export_to_ui().get("copied", [])
-
-#         ui_info = None
-#         if start_ui_after and ui_app_path:
-#             ui_info = start_ui(ui_app_path, port=ui_port)
-
-#         return _ascii_safe({
-#             "ok": len(saved_files) > 0 and len(errors) == 0,
-#             "saved": saved_files,
-#             "errors": errors,
-#             "exported": exported,
-#             "ui": ui_info,
-#         })
-#     except Exception as e:
-#         return _ascii_safe({"ok": False, "error": str(e)})
-
 # ---------------------------------------------------------------------------
 # Server main
 # ---------------------------------------------------------------------------
 
-import asyncio
 import inspect
 
 async def _main():
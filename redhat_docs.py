@@ -13,27 +13,53 @@ Key Features:
 - Minimal tool set to reduce API calls
 """
 
+import asyncio
+import json
 import os
 import re
+import tempfile
+import time
+from contextlib import asynccontextmanager, contextmanager, suppress
+from functools import lru_cache
+from importlib.util import find_spec
 from typing import Any
-from urllib.parse import urlparse
+from urllib.parse import urlsplit
 
 import httpx
 import urllib3
 from mcp.server.fastmcp import FastMCP
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: cache writes merge without a lock
+    fcntl = None
+
 # Disable SSL warnings for lab environments
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# Shared HTTP client, created on first use and closed when the server stops
+_client: httpx.AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+@asynccontextmanager
+async def _lifespan(server: FastMCP):
+    try:
+        yield {}
+    finally:
+        if _client is not None:
+            await _client.aclose()
+
+
 # Initialize FastMCP
-mcp = FastMCP("redhat-docs-streamlined")
+mcp = FastMCP("redhat-docs-streamlined", lifespan=_lifespan)
 
 # Base URLs for Red Hat documentation
 REDHAT_DOCS_BASE = "https://docs.redhat.com"
 REDHAT_ACCESS_BASE = "https://access.redhat.com"
 
 # Official Red Hat domains for validation (from README)
-OFFICIAL_REDHAT_DOMAINS = {
+OFFICIAL_REDHAT_DOMAINS = frozenset({
     # Core Red Hat domains
     "redhat.com", "docs.redhat.com", "access.redhat.com",
     "console.redhat.com", "cloud.redhat.com", "marketplace.redhat.com",
@@ -62,15 +88,24 @@ OFFICIAL_REDHAT_DOMAINS = {
     "security.redhat.com", "errata.redhat.com", "cve.redhat.com",
     # Business and enterprise
     "investors.redhat.com", "jobs.redhat.com", "careers.redhat.com",
-}
+})
 
-# Domain patterns for subdomain matching
-REDHAT_DOMAIN_PATTERNS = [
-    r".*\.redhat\.com$",
-    r".*\.openshift\.com$", 
-    r".*\.ansible\.com$",
-    r".*\.quay\.io$",
-]
+# Domain suffixes for subdomain matching (checked with one str.endswith call)
+REDHAT_DOMAIN_SUFFIXES = (
+    ".redhat.com",
+    ".openshift.com",
+    ".ansible.com",
+    ".quay.io",
+)
+
+# Pattern: /html/guide_name/index -> /pdf/guide_name/index
+_HTML_PATTERN = re.compile(r"/html(?:-single)?/([^/]+)/?(?:index)?$")
+
+# Content-Range of a 206 reply: "bytes <first>-<last>/<complete length>"
+_CONTENT_RANGE_RE = re.compile(r"bytes \d+-\d+/(\d+)")
+
+# Login-page markers, found in one case-insensitive pass without lowering a copy of the page
+_LOGIN_MARKERS_RE = re.compile(r"login|sign in", re.IGNORECASE)
 
 # HTTP client configuration
 default_headers = {
@@ -78,8 +113,165 @@ default_headers = {
     "Accept": "application/json, text/html, application/pdf, */*",
 }
 timeout = httpx.Timeout(30.0)
+limits = httpx.Limits(max_keepalive_connections=20, max_connections=40)
 
 
+def get_client() -> httpx.AsyncClient:
+    """
+    Return the shared AsyncClient so connections (and TLS sessions) are reused
+    across requests; HTTP/2 is used when the h2 package is installed.
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            timeout=timeout, verify=False, headers=default_headers, limits=limits,
+            http2=find_spec("h2") is not None,
+        )
+        _client_loop = loop
+    return _client
+
+
+# Disk cache of confirmed PDF probes (content type + size), shared across server
+# processes so known PDFs are not downloaded again just to check them
+CACHE_DIR = os.environ.get(
+    "REDHAT_DOCS_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "redhat_docs_mcp")
+)
+PDF_PROBE_TTL = 24 * 3600  # seconds
+# Past PDF_PROBE_TTL a probe is still served until PDF_PROBE_STALE_TTL, while a
+# background task re-probes the URL (stale-while-revalidate)
+PDF_PROBE_STALE_TTL = 7 * 24 * 3600  # seconds
+_pdf_probes: dict[str, dict] | None = None
+_pdf_refreshes: dict[str, asyncio.Task] = {}  # pdf url -> running re-probe
+
+
+def _load_disk_cache() -> dict[str, dict]:
+    """Load PDF probes younger than PDF_PROBE_STALE_TTL; {} if the file is missing, too old or unreadable."""
+    path = os.path.join(CACHE_DIR, "pdf_probes.json")
+    try:
+        if time.time() - os.path.getmtime(path) >= PDF_PROBE_STALE_TTL:
+            return {}
+        with open(path, encoding="utf-8") as f:
+            probes = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    now = time.time()
+    return {u: p for u, p in probes.items() if now - p.get("checked", 0) < PDF_PROBE_STALE_TTL}
+
+
+@contextmanager
+def _disk_cache_lock():
+    """Exclusive flock on CACHE_DIR/pdf_probes.lock, held across a read-merge-write."""
+    fd = None
+    if fcntl is not None:
+        with suppress(OSError):
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            fd = os.open(os.path.join(CACHE_DIR, "pdf_probes.lock"), os.O_RDWR | os.O_CREAT, 0o600)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        if fd is not None:
+            os.close(fd)
+
+
+def _save_disk_cache(changes: dict[str, dict | None]) -> None:
+    """
+    Apply `changes` (None drops a URL) to the in-memory probes, then write them
+    merged with the file's current contents, so probes written by other server
+    processes are kept (ours win for the changed URLs). The write is atomic
+    (temp file + os.replace); only once it succeeds does the in-memory cache
+    take on the merged view. Write failures are ignored.
+    """
+    global _pdf_probes
+    for url, probe in changes.items():
+        if probe is None:
+            _pdf_probes.pop(url, None)
+        else:
+            _pdf_probes[url] = probe
+    with _disk_cache_lock():
+        merged = {**_pdf_probes, **_load_disk_cache()}
+        for url, probe in changes.items():
+            if probe is None:
+                merged.pop(url, None)
+            else:
+                merged[url] = probe
+        tmp = None
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w", dir=CACHE_DIR, suffix=".tmp", delete=False, encoding="utf-8"
+            ) as f:
+                tmp = f.name
+                json.dump(merged, f)
+            os.replace(tmp, os.path.join(CACHE_DIR, "pdf_probes.json"))
+        except OSError:
+            if tmp is not None:
+                with suppress(OSError):
+                    os.unlink(tmp)
+            return
+    _pdf_probes = merged
+
+
+def _cached_pdf_probe(pdf_url: str) -> dict | None:
+    global _pdf_probes
+    if _pdf_probes is None:
+        _pdf_probes = _load_disk_cache()
+    probe = _pdf_probes.get(pdf_url)
+    if probe is None:
+        return None
+    age = time.time() - probe["checked"]
+    if age >= PDF_PROBE_STALE_TTL:
+        return None
+    if age >= PDF_PROBE_TTL and pdf_url not in _pdf_refreshes:
+        task = asyncio.create_task(_refresh_pdf_probe(pdf_url))
+        _pdf_refreshes[pdf_url] = task
+        task.add_done_callback(lambda _: _pdf_refreshes.pop(pdf_url, None))
+    return probe
+
+
+async def _refresh_pdf_probe(pdf_url: str) -> None:
+    """Re-probe a stale cached PDF; a failed probe drops the entry so the next call probes in line."""
+    result = await probe_pdf(pdf_url)
+    if isinstance(result, str):
+        _remember_failure(pdf_url, result)
+        if _pdf_probes is not None and pdf_url in _pdf_probes:
+            _save_disk_cache({pdf_url: None})
+    else:
+        _remember_pdf_probe(pdf_url, *result)
+
+
+def _remember_pdf_probe(pdf_url: str, content_type: str, size: int) -> dict:
+    probe = {"content_type": content_type, "size": size, "checked": time.time()}
+    if _pdf_probes is not None:
+        _save_disk_cache({pdf_url: probe})
+    return probe
+
+
+# Negative cache: URLs whose HTML fetch or PDF probe failed recently, so repeated
+# calls for a dead or erroring page return at once instead of paying another timeout
+NEGATIVE_CACHE_TTL = 300  # seconds
+NEGATIVE_CACHE_MAX = 1024
+_failed_urls: dict[str, tuple[float, str]] = {}  # url -> (monotonic expiry, error)
+
+
+def _recent_failure(url: str) -> str | None:
+    entry = _failed_urls.get(url)
+    if entry is None:
+        return None
+    if time.monotonic() >= entry[0]:
+        del _failed_urls[url]
+        return None
+    return entry[1]
+
+
+def _remember_failure(url: str, error: str) -> None:
+    if len(_failed_urls) >= NEGATIVE_CACHE_MAX:
+        del _failed_urls[next(iter(_failed_urls))]  # oldest entry
+    _failed_urls[url] = (time.monotonic() + NEGATIVE_CACHE_TTL, error)
+
+
+@lru_cache(maxsize=4096)
 def is_official_redhat_domain(url: str) -> bool:
     """
     Validate that a URL is from an official Red Hat domain.
@@ -91,33 +283,38 @@ def is_official_redhat_domain(url: str) -> bool:
         True if URL is from official Red Hat domain, False otherwise
     """
     try:
-        parsed = urlparse(url)
+        parsed = urlsplit(url)
         domain = parsed.netloc.lower()
         
         # Remove www. prefix if present
         if domain.startswith("www."):
             domain = domain[4:]
             
-        # Check exact domain matches
-        if domain in OFFICIAL_REDHAT_DOMAINS:
-            return True
-            
-        # Check subdomain patterns
-        for pattern in REDHAT_DOMAIN_PATTERNS:
-            if re.match(pattern, domain):
-                return True
-                
-        return False
+        # Subdomains of the core domains (most traffic) first, then the exact set
+        # for the rest (quay.io, opensource.com, ...)
+        return domain.endswith(REDHAT_DOMAIN_SUFFIXES) or domain in OFFICIAL_REDHAT_DOMAINS
         
     except Exception:
         return False
 
 
-async def make_request(url: str, method: str = "GET", **kwargs) -> httpx.Response | str:
-    """Make HTTP request with proper error handling."""
+async def make_request(
+    url: str, method: str = "GET", read_body: bool = True, **kwargs
+) -> httpx.Response | str:
+    """
+    Make HTTP request with proper error handling.
+
+    With read_body=False only the status line and headers are received on
+    success; the body is left unread and the connection released, so the
+    returned response's .text/.content must not be used.
+    """
     try:
-        async with httpx.AsyncClient(timeout=timeout, verify=False) as client:
-            response = await client.request(method, url, headers=default_headers, **kwargs)
+        if read_body:
+            response = await get_client().request(method, url, **kwargs)
+        else:
+            async with get_client().stream(method, url, **kwargs) as response:
+                if response.status_code != 200:
+                    await response.aread()  # error pages are quoted below
             
         if response.status_code == 200:
             return response
@@ -132,21 +329,115 @@ async def make_request(url: str, method: str = "GET", **kwargs) -> httpx.Respons
         return f"Unexpected error: {str(e)}"
 
 
+def _declared_size(headers: httpx.Headers) -> int | None:
+    """Body size from Content-Length, when it is present and not a compressed size."""
+    length = headers.get("content-length", "")
+    if length.isdigit() and not headers.get("content-encoding"):
+        return int(length)
+    return None
+
+
+def _range_total(headers: httpx.Headers) -> int | None:
+    """Full body size from a 206 reply's Content-Range, when known and unencoded."""
+    match = _CONTENT_RANGE_RE.fullmatch(headers.get("content-range", ""))
+    if match and not headers.get("content-encoding"):
+        return int(match.group(1))
+    return None
+
+
+async def probe_pdf(url: str) -> tuple[str, int] | str:
+    """
+    Return (content_type, size) for a candidate PDF. A HEAD request answers
+    this without any body when the server sends the type and an unencoded
+    Content-Length. Otherwise a one-byte ranged GET (Range: bytes=0-0) reads
+    the size from Content-Range; servers that ignore Range are handled from
+    the 200 reply's Content-Length, and only without any usable length is the
+    body streamed and counted. Bodies are never buffered; non-PDF responses
+    are closed unread. Errors come back as strings, like make_request.
+    """
+    try:
+        head = await get_client().head(url)
+        if head.status_code not in (405, 501):  # HEAD unsupported: fall through to GET
+            if head.status_code != 200:
+                return f"HTTP Error {head.status_code}"
+            content_type = head.headers.get("content-type", "")
+            if "pdf" not in content_type.lower():
+                return f"Not a PDF: {content_type}"
+            size = _declared_size(head.headers)
+            if size is not None:
+                return content_type, size
+        for headers in ({"Range": "bytes=0-0"}, None):
+            async with get_client().stream("GET", url, headers=headers) as response:
+                ranged = headers is not None and response.status_code == 206
+                if response.status_code != 200 and not ranged:
+                    return f"HTTP Error {response.status_code}"
+                content_type = response.headers.get("content-type", "")
+                if "pdf" not in content_type.lower():
+                    return f"Not a PDF: {content_type}"
+                if ranged:
+                    size = _range_total(response.headers)
+                    if size is not None:
+                        return content_type, size
+                    continue  # total length not given: retry without Range and count
+                size = _declared_size(response.headers)
+                if size is not None:
+                    return content_type, size  # closes the stream without reading the body
+                size = 0
+                async for chunk in response.aiter_bytes():
+                    size += len(chunk)
+                return content_type, size
+    except httpx.TimeoutException:
+        return "Request timeout - Red Hat service may be slow"
+    except httpx.RequestError as e:
+        return f"Request error: {str(e)}"
+    except Exception as e:
+        return f"Unexpected error: {str(e)}"
+
+
+@lru_cache(maxsize=4096)
 def extract_pdf_url(html_url: str) -> str:
     """Convert HTML documentation URL to corresponding PDF URL."""
-    # Pattern: /html/guide_name/index -> /pdf/guide_name/index
-    html_pattern = r"/html(?:-single)?/([^/]+)/?(?:index)?$"
-    match = re.search(html_pattern, html_url)
+    match = _HTML_PATTERN.search(html_url)
     
     if match:
         guide_name = match.group(1)
-        # Replace html with pdf and add index
-        pdf_url = re.sub(html_pattern, f"/pdf/{guide_name}/index", html_url)
-        return pdf_url
+        # Replace html with pdf and add index (the pattern is $-anchored: one match at most)
+        return html_url[:match.start()] + f"/pdf/{guide_name}/index"
         
     return html_url
 
 
+# Static parts of search_redhat_content's output, built once. One row per
+# content type: (content_types selector, output key, query templates (top two),
+# purpose template, expected domain, content_type, requires_auth)
+_QUERY_GROUPS = (
+    (
+        "docs", "documentation_queries",
+        ("{} site:docs.redhat.com", "{} site:docs.redhat.com filetype:pdf"),
+        "Find official Red Hat documentation for {}", "docs.redhat.com", "documentation", False,
+    ),
+    (
+        "access", "support_queries",
+        ("{} site:access.redhat.com", "{} troubleshooting site:access.redhat.com"),
+        "Find Red Hat support content for {}", "access.redhat.com", "support", "varies",
+    ),
+)
+_SEARCH_INSTRUCTIONS = """
+To use these search queries:
+1. Use the WebSearch MCP tool with each query
+2. Validate all returned URLs are from official Red Hat domains
+3. Use fetch_redhat_content() to access the documentation
+4. For docs.redhat.com URLs, prefer PDF format for reliable content extraction
+5. For access.redhat.com URLs, check if authentication is required
+    """
+_SEARCH_WORKFLOW_TAIL = (
+    "2. Filter results to Red Hat official domains only",
+    "3. Categorize results by content type (docs vs support)",
+    "4. Use fetch_redhat_content() for each relevant URL",
+    "5. Handle authentication requirements for premium content",
+)
+
+
 @mcp.tool()
 async def search_redhat_content(
     query: str,
@@ -166,6 +457,7 @@ async def search_redhat_content(
     """
     if content_types is None:
         content_types = ["all"]
+    want_all = "all" in content_types
         
     search_queries = {
         "query": query,
@@ -175,62 +467,29 @@ async def search_redhat_content(
         "workflow": []
     }
     
-    # Generate documentation search queries (docs.redhat.com)
-    if "docs" in content_types or "all" in content_types:
-        docs_queries = [
-            f"{query} site:docs.redhat.com",
-            f"{query} site:docs.redhat.com filetype:pdf",
-            f"{query} installation guide site:docs.redhat.com",
-            f"{query} documentation site:docs.redhat.com"
-        ]
-        
-        for i, q in enumerate(docs_queries[:2]):  # Limit to top 2 queries
-            search_queries["documentation_queries"].append({
-                "query": q,
-                "purpose": f"Find official Red Hat documentation for {query}",
-                "expected_domains": ["docs.redhat.com"],
-                "content_type": "documentation",
-                "requires_auth": False,
-                "priority": i + 1
-            })
-    
-    # Generate support content queries (access.redhat.com)  
-    if "access" in content_types or "all" in content_types:
-        support_queries = [
-            f"{query} site:access.redhat.com",
-            f"{query} troubleshooting site:access.redhat.com",
-            f"{query} solution site:access.redhat.com",
-            f"{query} error site:access.redhat.com"
-        ]
-        
-        for i, q in enumerate(support_queries[:2]):  # Limit to top 2 queries
-            search_queries["support_queries"].append({
-                "query": q,
-                "purpose": f"Find Red Hat support content for {query}",
-                "expected_domains": ["access.redhat.com"],
-                "content_type": "support",
-                "requires_auth": "varies",
-                "priority": i + 1
-            })
+    # Generate documentation (docs.redhat.com) and support (access.redhat.com) queries
+    for selector, key, templates, purpose, domain, content_type, requires_auth in _QUERY_GROUPS:
+        if want_all or selector in content_types:
+            purpose = purpose.format(query)
+            search_queries[key] = [
+                {
+                    "query": template.format(query),
+                    "purpose": purpose,
+                    "expected_domains": [domain],
+                    "content_type": content_type,
+                    "requires_auth": requires_auth,
+                    "priority": i + 1
+                }
+                for i, template in enumerate(templates)
+            ]
     
-    # Generate usage instructions
-    search_queries["instructions"] = """
-To use these search queries:
-1. Use the WebSearch MCP tool with each query
-2. Validate all returned URLs are from official Red Hat domains
-3. Use fetch_redhat_content() to access the documentation
-4. For docs.redhat.com URLs, prefer PDF format for reliable content extraction
-5. For access.redhat.com URLs, check if authentication is required
-    """
+    search_queries["instructions"] = _SEARCH_INSTRUCTIONS
     
     # Generate workflow steps
     total_queries = len(search_queries["documentation_queries"]) + len(search_queries["support_queries"])
     search_queries["workflow"] = [
         f"1. Execute {total_queries} web searches using the provided queries",
-        "2. Filter results to Red Hat official domains only",
-        "3. Categorize results by content type (docs vs support)",
-        "4. Use fetch_redhat_content() for each relevant URL",
-        "5. Handle authentication requirements for premium content"
+        *_SEARCH_WORKFLOW_TAIL
     ]
     
     search_queries["total_queries"] = total_queries
@@ -238,6 +497,51 @@ To use these search queries:
     return search_queries
 
 
+def _docs_html_result(response: httpx.Response, url: str, content_type: str) -> tuple[str, str]:
+    """docs.redhat.com - often requires JavaScript rendering."""
+    return "html_js_required", (
+        f"HTML content from {url}\n\n"
+        f"Note: docs.redhat.com content often requires JavaScript rendering.\n"
+        f"Content-Type: {content_type}\n"
+        f"Status: {response.status_code}\n\n"
+        f"Recommendation: Try the PDF version for reliable content extraction.\n"
+        f"Alternative: Use browser automation for full content access."
+    )
+
+
+def _access_html_result(response: httpx.Response, url: str, content_type: str) -> tuple[str, str]:
+    """access.redhat.com - may be directly accessible."""
+    text = response.text
+    # Check if we got actual content or a login page
+    if _LOGIN_MARKERS_RE.search(text):
+        return "auth_required", (
+            f"Authentication required for {url}\n\n"
+            f"This content requires Red Hat Customer Portal login.\n"
+            f"Content-Type: {content_type}\n"
+            f"Status: {response.status_code}\n\n"
+            f"Note: Some access.redhat.com content is subscription-only."
+        )
+    # Return first 2000 characters of content
+    truncated = "...[truncated]" if len(text) > 2000 else ""
+    return "success_html", (
+        f"HTML content from {url}\n\n"
+        f"Content-Type: {content_type}\n"
+        f"Status: {response.status_code}\n"
+        f"Content length: {len(text):,} characters\n\n"
+        f"Content preview:\n{text[:2000]}{truncated}"
+    )
+
+
+# fetch_redhat_content's HTML handling by host (www. stripped); other hosts get no details
+_HTML_HANDLERS = {
+    "docs.redhat.com": _docs_html_result,
+    "access.redhat.com": _access_html_result,
+}
+
+# Running fetches by (url, format_preference): identical concurrent calls share one
+_inflight: dict[tuple[str, str], asyncio.Task] = {}
+
+
 @mcp.tool()
 async def fetch_redhat_content(url: str, format_preference: str = "auto") -> str:
     """
@@ -250,11 +554,22 @@ async def fetch_redhat_content(url: str, format_preference: str = "auto") -> str
     Returns:
         Content from the documentation or error message
     """
+    key = (url, format_preference)
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_fetch_redhat_content(url, format_preference))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    # Shielded so one caller going away does not cancel the fetch for the others
+    return await asyncio.shield(task)
+
+
+async def _fetch_redhat_content(url: str, format_preference: str) -> str:
     # Validate URL is from Red Hat domains
     if not is_official_redhat_domain(url):
         return f"Error: URL must be from official Red Hat domains. Provided: {url}"
     
-    parsed_url = urlparse(url)
+    parsed_url = urlsplit(url)
     content_info = {
         "url": url,
         "domain": parsed_url.netloc,
@@ -263,32 +578,53 @@ async def fetch_redhat_content(url: str, format_preference: str = "auto") -> str
         "status": ""
     }
     
+    # In auto mode the HTML fallback is requested alongside the PDF probe, so a
+    # missing PDF costs no extra round trip; it is cancelled if the PDF works
+    html_fetch = None
+    # Per-host HTML handling; only the access.redhat.com handler reads the page,
+    # the others need just the status and headers, so no body is downloaded for them
+    host = parsed_url.hostname or ""
+    handler = _HTML_HANDLERS.get(host[4:] if host.startswith("www.") else host)
+    html_body_needed = handler is _access_html_result
+    
     # Try PDF first if auto or pdf preference (handles rendering issues)
     if format_preference in ["auto", "pdf"]:
         if "/html" in url:
             pdf_url = extract_pdf_url(url)
             if pdf_url != url:
                 content_info["format_attempted"].append("pdf")
-                response = await make_request(pdf_url)
-                if not isinstance(response, str) and response.status_code == 200:
-                    # Check if it's actually a PDF
-                    content_type = response.headers.get("content-type", "")
-                    if "pdf" in content_type.lower():
-                        content_info["status"] = "success_pdf"
-                        content_info["content"] = (
-                            f"PDF Content successfully accessed from {pdf_url}\n\n"
-                            f"Content-Type: {content_type}\n"
-                            f"Size: {len(response.content):,} bytes\n\n"
-                            f"Note: PDF content extraction would require additional processing.\n"
-                            f"This confirms the PDF is accessible and can be processed by PDF libraries."
-                        )
-                        return f"SUCCESS: {content_info['content']}"
+                probe = _cached_pdf_probe(pdf_url)
+                if probe is None and _recent_failure(pdf_url) is None:
+                    if format_preference == "auto" and _recent_failure(url) is None:
+                        html_fetch = asyncio.ensure_future(make_request(url, read_body=html_body_needed))
+                    result = await probe_pdf(pdf_url)
+                    if isinstance(result, str):
+                        _remember_failure(pdf_url, result)
+                    else:
+                        probe = _remember_pdf_probe(pdf_url, *result)
+                if probe is not None:
+                    content_info["status"] = "success_pdf"
+                    content_info["content"] = (
+                        f"PDF Content successfully accessed from {pdf_url}\n\n"
+                        f"Content-Type: {probe['content_type']}\n"
+                        f"Size: {probe['size']:,} bytes\n\n"
+                        f"Note: PDF content extraction would require additional processing.\n"
+                        f"This confirms the PDF is accessible and can be processed by PDF libraries."
+                    )
+                    if html_fetch is not None:
+                        html_fetch.cancel()
+                    return f"SUCCESS: {content_info['content']}"
     
     # Fall back to HTML if PDF not available or html preference
     if format_preference in ["auto", "html"]:
         content_info["format_attempted"].append("html")
-        response = await make_request(url)
+        failure = _recent_failure(url)
+        response = failure if failure is not None else await (
+            html_fetch or make_request(url, read_body=html_body_needed)
+        )
         if isinstance(response, str):  # Error occurred
+            if failure is None:
+                _remember_failure(url, response)
             content_info["status"] = "error"
             content_info["content"] = f"Error accessing content: {response}"
             return f"ERROR: {content_info['content']}"
@@ -296,44 +632,8 @@ async def fetch_redhat_content(url: str, format_preference: str = "auto") -> str
         # Check content type and handle appropriately
         content_type = response.headers.get("content-type", "")
         
-        # For docs.redhat.com - often requires JavaScript rendering
-        if "docs.redhat.com" in url:
-            content_info["status"] = "html_js_required"
-            content_info["content"] = (
-                f"HTML content from {url}\n\n"
-                f"Note: docs.redhat.com content often requires JavaScript rendering.\n"
-                f"Content-Type: {content_type}\n"
-                f"Status: {response.status_code}\n\n"
-                f"Recommendation: Try the PDF version for reliable content extraction.\n"
-                f"Alternative: Use browser automation for full content access."
-            )
-        
-        # For access.redhat.com - may be directly accessible
-        elif "access.redhat.com" in url:
-            if response.status_code == 200:
-                # Check if we got actual content or a login page
-                text_content = response.text.lower()
-                if "login" in text_content or "sign in" in text_content:
-                    content_info["status"] = "auth_required"
-                    content_info["content"] = (
-                        f"Authentication required for {url}\n\n"
-                        f"This content requires Red Hat Customer Portal login.\n"
-                        f"Content-Type: {content_type}\n"
-                        f"Status: {response.status_code}\n\n"
-                        f"Note: Some access.redhat.com content is subscription-only."
-                    )
-                else:
-                    content_info["status"] = "success_html"
-                    # Return first 2000 characters of content
-                    content_preview = response.text[:2000]
-                    content_info["content"] = (
-                        f"HTML content from {url}\n\n"
-                        f"Content-Type: {content_type}\n"
-                        f"Status: {response.status_code}\n"
-                        f"Content length: {len(response.text):,} characters\n\n"
-                        f"Content preview:\n{content_preview}"
-                        f"{'...[truncated]' if len(response.text) > 2000 else ''}"
-                    )
+        if handler is not None:
+            content_info["status"], content_info["content"] = handler(response, url, content_type)
         
         return f"{'SUCCESS' if 'success' in content_info['status'] else 'INFO'}: {content_info['content']}"
     
@@ -341,5 +641,4 @@ async def fetch_redhat_content(url: str, format_preference: str = "auto") -> str
 
 
 if __name__ == "__main__":
-    import asyncio
     mcp.run()
\ No newline at end of file
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+import redhat_docs
+
+
+@pytest.fixture
+def probes(monkeypatch):
+    """Fresh in-memory PDF probe cache for each test."""
+    monkeypatch.setattr(redhat_docs, "_pdf_probes", {})
+
+
+def test_probes_kept_in_memory_when_cache_dir_unwritable(monkeypatch, probes):
+    monkeypatch.setattr(redhat_docs, "CACHE_DIR", "/dev/null/sub")
+
+    redhat_docs._remember_pdf_probe("/a", "application/pdf", 1)
+    redhat_docs._remember_pdf_probe("/b", "application/pdf", 2)
+
+    assert set(redhat_docs._pdf_probes) == {"/a", "/b"}
+    assert redhat_docs._cached_pdf_probe("/a")["size"] == 1
+
+
+def test_save_merges_probes_written_by_other_processes(monkeypatch, tmp_path, probes):
+    monkeypatch.setattr(redhat_docs, "CACHE_DIR", str(tmp_path))
+    redhat_docs._remember_pdf_probe("/a", "application/pdf", 1)
+    # another server process adds /other and rewrites /a
+    path = tmp_path / "pdf_probes.json"
+    on_disk = json.loads(path.read_text())
+    checked = on_disk["/a"]["checked"]
+    on_disk["/a"] = {"content_type": "application/pdf", "size": 99, "checked": checked}
+    on_disk["/other"] = {"content_type": "application/pdf", "size": 3, "checked": checked}
+    path.write_text(json.dumps(on_disk))
+
+    redhat_docs._remember_pdf_probe("/b", "application/pdf", 2)
+
+    assert set(json.loads(path.read_text())) == {"/a", "/b", "/other"}
+    assert redhat_docs._cached_pdf_probe("/other")["size"] == 3
+
+
+def test_save_drops_url(monkeypatch, tmp_path, probes):
+    monkeypatch.setattr(redhat_docs, "CACHE_DIR", str(tmp_path))
+    redhat_docs._remember_pdf_probe("/a", "application/pdf", 1)
+    redhat_docs._remember_pdf_probe("/b", "application/pdf", 2)
+
+    redhat_docs._save_disk_cache({"/a": None})
+
+    assert set(redhat_docs._pdf_probes) == {"/b"}
+    assert set(json.loads((tmp_path / "pdf_probes.json").read_text())) == {"/b"}